@@ -0,0 +1,99 @@
+# Backend/app/cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+class CacheBackend:
+    """Interface for the read-through caches. Values must be plain JSON-able data so a
+    networked store (e.g. Redis) can implement the same methods."""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+class LRUCache(CacheBackend):
+    """In-process cache with per-entry TTL and least-recently-used eviction."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+# Named caches, so their hit ratios can be reported (see app/metrics.py)
+CACHES: Dict[str, CacheBackend] = {}
+
+def register_cache(name: str, cache: CacheBackend) -> CacheBackend:
+    CACHES[name] = cache
+    return cache
+
+# Cache for course rows and course list pages. Each worker process has its own copy, and a
+# course write only invalidates the copy of the worker that handled it, so other workers can
+# serve the old course (and its old ETag) for up to COURSE_CACHE_TTL seconds after a write.
+# Keep the TTL at the longest staleness the catalog can live with.
+COURSE_CACHE_SIZE = int(os.getenv("COURSE_CACHE_SIZE", "2048"))
+COURSE_CACHE_TTL = float(os.getenv("COURSE_CACHE_TTL", "30"))
+
+course_cache: CacheBackend = register_cache("courses", LRUCache(max_entries=COURSE_CACHE_SIZE, ttl=COURSE_CACHE_TTL))
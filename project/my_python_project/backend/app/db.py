@@ -1,17 +1,171 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import os
+import threading
+import time
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Async drivers for the sync URLs we accept in DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    """Swap the driver of a sync database URL for its async counterpart."""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database URL scheme '{scheme}'")
+    return f"{ASYNC_DRIVERS[dialect]}{sep}{rest}"
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+
+# Connection pool settings (per engine, so per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Seconds; -1 disables recycling
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+
+# Driver-specific connect arguments, keyed by (backend, driver)
+CONNECT_ARGS = {
+    ("sqlite", "pysqlite"): {"check_same_thread": False},
+    ("postgresql", "psycopg"): {"connect_timeout": DB_CONNECT_TIMEOUT},
+    ("postgresql", "psycopg2"): {"connect_timeout": DB_CONNECT_TIMEOUT},
+    ("postgresql", "asyncpg"): {"timeout": DB_CONNECT_TIMEOUT},
+}
+
+class PoolStats:
+    """Counters for how long callers waited to check a connection out of a pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            self.waits += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            if timed_out:
+                self.timeouts += 1
+
+class TimedPoolMixin:
+    """Records checkout wait times on a queue pool into a PoolStats instance."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        # Keep the counters when the engine is disposed and the pool rebuilt
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+class TimedAsyncAdaptedQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Build create_engine keyword arguments for the dialect and driver in url."""
+    parsed = make_url(url)
+    backend, driver = parsed.get_backend_name(), parsed.get_driver_name()
+    options = {}
+    connect_args = CONNECT_ARGS.get((backend, driver))
+    if connect_args:
+        options["connect_args"] = dict(connect_args)
+    # In-memory SQLite lives inside a single connection, so it keeps SQLAlchemy's default pool
+    if backend == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options
+    options.update(
+        poolclass=TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    return options
+
+def pool_stats(engine) -> dict:
+    """Snapshot of an engine's pool: checked-out, idle and overflow connections plus wait times."""
+    pool = engine.pool
+    snapshot = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        snapshot.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        snapshot.update(
+            waits=stats.waits,
+            timeouts=stats.timeouts,
+            avg_wait_ms=round(stats.total_wait / stats.waits * 1000, 3) if stats.waits else 0.0,
+            max_wait_ms=round(stats.max_wait * 1000, 3),
+        )
+    return snapshot
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async engine used by the read-heavy routers so they don't occupy threadpool slots
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# Dialect-specific INSERT constructs that support ON CONFLICT clauses
+CONFLICT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+def conflict_insert(db, model):
+    """INSERT for model supporting on_conflict_do_nothing/do_update on the session's dialect."""
+    dialect = db.get_bind().dialect.name
+    if dialect not in CONFLICT_INSERTS:
+        raise ValueError(f"INSERT ... ON CONFLICT is not supported on '{dialect}'")
+    return CONFLICT_INSERTS[dialect](model)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def init_db():
+    # Import the models so their tables are registered on Base.metadata, and the search
+    # module so its index is created alongside them
+    from app import search  # noqa: F401
+    from app.models import course, job, material, quiz, user  # noqa: F401
+    Base.metadata.create_all(bind=engine)
@@ -0,0 +1,47 @@
+# Backend/app/http_cache.py
+
+import hashlib
+import json
+from typing import Any, Optional
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from app.responses import FastJSONResponse
+
+def make_etag(content: Any) -> str:
+    """Strong ETag from a hash of the canonical JSON form of content."""
+    body = json.dumps(jsonable_encoder(content), sort_keys=True, separators=(",", ":"))
+    return '"' + hashlib.sha256(body.encode()).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def not_modified(request: Request, etag: str, cache_control: str) -> Optional[Response]:
+    """A 304 response if the client already holds this ETag, so callers can skip loading the body."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    return None
+
+def conditional_response(request: Request, content: Any, etag: str, cache_control: str) -> Response:
+    """Return 304 when the client already holds this ETag, otherwise the JSON body.
+
+    content must already be plain JSON data; it is encoded as-is, without jsonable_encoder.
+    """
+    response = not_modified(request, etag, cache_control)
+    if response is not None:
+        return response
+    return FastJSONResponse(content=content, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def encoded_response(request: Request, body: bytes, etag: str, cache_control: str) -> Response:
+    """Like conditional_response, for a body that is already serialized JSON."""
+    response = not_modified(request, etag, cache_control)
+    if response is not None:
+        return response
+    return Response(
+        content=body, media_type="application/json", headers={"ETag": etag, "Cache-Control": cache_control},
+    )
@@ -0,0 +1,262 @@
+# Backend/app/jobs.py
+
+"""Local background job queue backed by the application database.
+
+Request handlers enqueue jobs with enqueue_job(); worker processes started with
+`python -m app.jobs` claim and run them. No external broker is needed: the jobs
+table is the queue, so every uvicorn worker and every job worker sees the same jobs.
+
+A running job is leased to its worker, which renews the lease every JOB_HEARTBEAT_INTERVAL
+seconds while the handler runs. A job whose lease has not been renewed for
+JOB_LEASE_TIMEOUT seconds belonged to a worker that died, and is requeued, however long
+the job itself takes.
+
+Per-type concurrency limits are enforced when a job is claimed. On SQLite, writes are
+serialized, so the running-job count checked in the claiming UPDATE is always current.
+On PostgreSQL the claims of a job type are serialized with a transaction-scoped advisory
+lock first; other databases get no such guarantee and may briefly exceed a limit.
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import SessionLocal
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+# Modules that register job handlers; worker processes import them on start-up
+JOB_MODULES = ["app.routers.upload"]
+
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "5.0"))  # Doubles after every failed attempt
+JOB_LEASE_TIMEOUT = float(os.getenv("JOB_LEASE_TIMEOUT", "300"))  # Running jobs not renewed for this long are requeued
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))  # How often a running job's lease is renewed
+JOB_REQUEUE_INTERVAL = float(os.getenv("JOB_REQUEUE_INTERVAL", "60"))  # How often each worker looks for them
+
+class JobType:
+    """A registered job handler with its concurrency and retry limits."""
+
+    def __init__(self, name: str, handler: Callable[[dict], Optional[dict]], concurrency: int, max_attempts: int):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+
+JOB_TYPES: Dict[str, JobType] = {}
+
+def job_handler(name: str, concurrency: int = 1, max_attempts: int = 3):
+    """Register a function as the handler for a job type.
+
+    The handler receives the job payload and may return a JSON-able result. At most
+    `concurrency` jobs of this type run at once across all workers, and a failing job
+    is retried with exponential backoff until it has run `max_attempts` times.
+    """
+    def register(handler):
+        JOB_TYPES[name] = JobType(name, handler, concurrency, max_attempts)
+        return handler
+    return register
+
+def job_to_dict(job: Job) -> dict:
+    return {
+        "id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+    }
+
+async def enqueue_job(db: AsyncSession, job_type: str, payload: dict, delay: float = 0.0) -> int:
+    """Add a job to the queue and return its id; the caller's session is committed."""
+    if job_type not in JOB_TYPES:
+        raise ValueError(f"Unknown job type '{job_type}'")
+    job = Job(
+        job_type=job_type,
+        payload=json.dumps(payload),
+        status="queued",
+        attempts=0,
+        max_attempts=JOB_TYPES[job_type].max_attempts,
+        run_after=time.time() + delay,
+    )
+    db.add(job)
+    await db.flush()
+    job_id = job.id
+    await db.commit()
+    return job_id
+
+async def get_job(db: AsyncSession, job_id: int) -> Optional[Job]:
+    return await db.get(Job, job_id)
+
+class JobWorker:
+    """Claims queued jobs from the database and runs them one at a time."""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        job_types: Optional[Dict[str, JobType]] = None,
+        heartbeat_interval: float = JOB_HEARTBEAT_INTERVAL,
+    ):
+        self.session_factory = session_factory
+        self.job_types = JOB_TYPES if job_types is None else job_types
+        self.heartbeat_interval = heartbeat_interval
+
+    def claim(self, db) -> Optional[Job]:
+        """Atomically move one eligible job to running, respecting per-type concurrency."""
+        now = time.time()
+        candidates = db.execute(
+            select(Job.id, Job.job_type)
+            .where(Job.status == "queued", Job.run_after <= now, Job.job_type.in_(list(self.job_types)))
+            .order_by(Job.run_after, Job.id)
+            .limit(20)
+        ).all()
+        for job_id, job_type in candidates:
+            running = (
+                select(func.count()).select_from(Job)
+                .where(Job.job_type == job_type, Job.status == "running")
+                .scalar_subquery()
+            )
+            if db.get_bind().dialect.name == "postgresql":
+                # Under READ COMMITTED two claims could count the same running jobs; take turns per type
+                db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"jobs:{job_type}"))))
+            # The status check makes the claim race-free between workers; the running count
+            # is checked in the same statement, so limits hold under SQLite's serialized writes
+            claimed = db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "queued", running < self.job_types[job_type].concurrency)
+                .values(status="running", attempts=Job.attempts + 1, started_at=now, leased_at=now)
+            )
+            db.commit()
+            if claimed.rowcount:
+                return db.get(Job, job_id)
+        return None
+
+    def run_once(self) -> bool:
+        """Run a single job if one is eligible. Returns whether a job ran."""
+        with self.session_factory() as db:
+            job = self.claim(db)
+            if job is None:
+                return False
+            try:
+                with self.heartbeat(job.id):
+                    result = self.job_types[job.job_type].handler(json.loads(job.payload))
+            except Exception:
+                job.error = traceback.format_exc(limit=5)
+                if job.attempts < job.max_attempts:
+                    job.status = "queued"
+                    job.run_after = time.time() + JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+                else:
+                    job.status = "failed"
+                    job.finished_at = time.time()
+                logger.warning("Job %s (%s) failed on attempt %s", job.id, job.job_type, job.attempts)
+            else:
+                job.status = "succeeded"
+                job.result = json.dumps(result) if result is not None else None
+                job.error = None
+                job.finished_at = time.time()
+            db.commit()
+            return True
+
+    @contextmanager
+    def heartbeat(self, job_id: int):
+        """Renew the job's lease from a background thread while the body runs."""
+        stop = threading.Event()
+
+        def renew():
+            while not stop.wait(self.heartbeat_interval):
+                try:
+                    with self.session_factory() as db:
+                        renewed = db.execute(
+                            update(Job).where(Job.id == job_id, Job.status == "running").values(leased_at=time.time())
+                        )
+                        db.commit()
+                    if not renewed.rowcount:
+                        logger.warning("Job %s is no longer running here; its lease was not renewed", job_id)
+                except Exception:
+                    logger.exception("Could not renew the lease of job %s", job_id)
+
+        thread = threading.Thread(target=renew, name=f"job-{job_id}-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def requeue_stale(self, timeout: float = JOB_LEASE_TIMEOUT) -> int:
+        """Put back jobs left running by a worker that died mid-job; returns how many.
+
+        A job is stale once its lease has gone timeout seconds without being renewed. One
+        that has already used all its attempts is marked failed instead, so a job that
+        crashes its worker (e.g. by running out of memory) is not retried forever.
+        """
+        now = time.time()
+        stale = (Job.status == "running", Job.leased_at < now - timeout)
+        with self.session_factory() as db:
+            failed = db.execute(
+                update(Job)
+                .where(*stale, Job.attempts >= Job.max_attempts)
+                .values(status="failed", finished_at=now, error="Worker stopped while running the job")
+            )
+            requeued = db.execute(update(Job).where(*stale).values(status="queued", run_after=now))
+            db.commit()
+        if failed.rowcount:
+            logger.warning("Marked %s stale jobs failed after their last attempt", failed.rowcount)
+        if requeued.rowcount:
+            logger.warning("Requeued %s stale jobs", requeued.rowcount)
+        return requeued.rowcount
+
+    def run_forever(self):
+        next_requeue = 0.0
+        while True:
+            # Every worker keeps looking for jobs abandoned by workers that died since it started
+            if time.monotonic() >= next_requeue:
+                self.requeue_stale()
+                next_requeue = time.monotonic() + JOB_REQUEUE_INTERVAL
+            if not self.run_once():
+                time.sleep(JOB_POLL_INTERVAL)
+
+def worker_main():
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+    JobWorker().run_forever()
+
+def start_worker(n: int) -> multiprocessing.Process:
+    worker = multiprocessing.Process(target=worker_main, name=f"job-worker-{n}")
+    worker.start()
+    return worker
+
+def run_workers(processes: int):
+    """Start job worker processes and keep them running, restarting any that exit."""
+    workers = [start_worker(n) for n in range(processes)]
+    try:
+        while True:
+            time.sleep(JOB_POLL_INTERVAL)
+            for n, worker in enumerate(workers):
+                if not worker.is_alive():
+                    logger.error("%s exited with code %s; restarting it", worker.name, worker.exitcode)
+                    workers[n] = start_worker(n)
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job workers.")
+    parser.add_argument("--processes", type=int, default=2)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    # Go through the importable module so handlers register into the JOB_TYPES the workers read
+    importlib.import_module("app.jobs").run_workers(args.processes)
@@ -1,16 +1,68 @@
 
 # Backend/app/main.py
 
-from fastapi import FastAPI
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import users, courses, quizzes, upload, auth, seed
-from .db import init_db  # Optional: Initialize the database if needed
+from .routers import courses, quizzes, upload, auth, payments
+from . import seed
+from . import metrics
+from .db import AsyncSessionLocal, async_engine, engine, get_async_db, init_db
+from .profiling import RequestTimingMiddleware, instrument_engine
+from .responses import FastJSONResponse
+from .write_behind import flush_all
+
+logger = logging.getLogger(__name__)
+
+# Set WARM_CACHES=0 to skip filling the caches during start-up (e.g. in short-lived test runs)
+WARM_CACHES = os.getenv("WARM_CACHES", "1") != "0"
+
+# Set SEED_ENDPOINT=1 to mount the admin-only seeding endpoint (local and load-test databases only)
+SEED_ENDPOINT = os.getenv("SEED_ENDPOINT", "0") == "1"
+
+async def warm_caches():
+    """Run every router's cache warmer concurrently, each on its own session."""
+    async def warm(warmer):
+        async with AsyncSessionLocal() as db:
+            await warmer(db)
+
+    warmers = (courses.warm_cache, quizzes.warm_cache)
+    results = await asyncio.gather(*(warm(warmer) for warmer in warmers), return_exceptions=True)
+    for warmer, result in zip(warmers, results):
+        if isinstance(result, Exception):
+            # A cold cache only costs the first requests a query; do not fail start-up over it
+            logger.warning("Cache warmer %s.%s failed: %r", warmer.__module__, warmer.__name__, result)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Blocking set-up runs in threads side by side: creating tables, the upload folder and
+    # loading the password hashing and JWT libraries, which the routers import lazily
+    await asyncio.gather(
+        asyncio.to_thread(init_db),
+        asyncio.to_thread(upload.ensure_upload_folder),
+        asyncio.to_thread(auth.warm_up),
+    )
+    if WARM_CACHES:
+        await warm_caches()
+    metrics.start_snapshots()
+    yield
+    # Flush buffered quiz scores and course progress before the worker exits
+    await flush_all()
+    await metrics.stop_snapshots()
 
 # Initialize the FastAPI app with metadata
 app = FastAPI(
     title="Course Platform API",
     description="API for managing courses, users, quizzes, uploads, and more.",
     version="1.0.0",
+    default_response_class=FastJSONResponse,  # orjson when installed; see app/responses.py
+    lifespan=lifespan,
 )
 
 # Adding CORS middleware to allow cross-origin requests (useful for frontend development)
@@ -22,25 +74,41 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Time every request per route and charge database queries to it (adds Server-Timing headers)
+app.add_middleware(RequestTimingMiddleware)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
 # Include routers for different parts of the app
-app.include_router(users.router, prefix="/users", tags=["Users"])
-app.include_router(courses.router, prefix="/courses", tags=["Courses"])
+app.include_router(courses.router)  # The courses router carries its own /courses prefix
 app.include_router(quizzes.router, prefix="/quizzes", tags=["Quizzes"])
 app.include_router(upload.router, prefix="/upload", tags=["Upload"])
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
-app.include_router(seed.router, prefix="/seed", tags=["Seed"])
-
-# Optional: Database initialization on app startup (if using a database)
-@app.on_event("startup")
-async def startup():
-    # Initialize the database here, if necessary (e.g., SQLite, PostgreSQL, etc.)
-    init_db()
+app.include_router(payments.router)
+if SEED_ENDPOINT:
+    app.include_router(seed.router, prefix="/seed", tags=["Seed"])
 
-# Simple health check endpoint
+# Simple health check endpoint (liveness: the process is up)
 @app.get("/health")
 async def health_check():
     return {"status": "Healthy"}
 
+READINESS_TIMEOUT = float(os.getenv("READINESS_TIMEOUT", "2"))
+
+# Readiness check: only report ready when the database answers
+@app.get("/ready")
+async def readiness_check(db: AsyncSession = Depends(get_async_db)):
+    try:
+        await asyncio.wait_for(db.execute(text("SELECT 1")), READINESS_TIMEOUT)
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "Unavailable", "database": type(e).__name__})
+    return {"status": "Ready", "database": "ok"}
+
+# Prometheus metrics, aggregated across worker processes when METRICS_DIR is set
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return Response(content=metrics.render(metrics.collect()), media_type=metrics.CONTENT_TYPE)
+
 # Main entry point when the app runs
 if __name__ == "_main_":
     import uvicorn
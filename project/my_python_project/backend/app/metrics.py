@@ -0,0 +1,257 @@
+# Backend/app/metrics.py
+
+"""Prometheus text-format metrics for /metrics.
+
+Most metrics are read at scrape time from state the application already keeps: route
+latencies and query counts from app/profiling.py, connection pool counters from
+app/db.py, the registered caches in app/cache.py and the write-behind buffers. Events
+with no other home (uploaded bytes, quiz submissions) are counted with inc().
+
+Each uvicorn worker process only sees its own numbers. With METRICS_DIR set, every
+worker writes a snapshot of its metrics to METRICS_DIR/<pid>.json every
+METRICS_SNAPSHOT_INTERVAL seconds (and on shutdown), and whichever worker serves a scrape
+adds up all snapshots: counters and histograms from every process that ever wrote one,
+gauges only from processes still alive. Other workers' numbers are therefore up to one
+interval old. Rates such as quiz submissions per second come from rate() on the counters.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+from app import profiling
+from app.cache import CACHES
+from app.db import async_engine, engine, pool_stats
+from app.write_behind import BUFFERS
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_SNAPSHOT_INTERVAL = float(os.getenv("METRICS_SNAPSHOT_INTERVAL", "5"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# name -> (type, help). Histograms carry their bucket bounds alongside the samples.
+METRICS = {
+    "http_requests_total": ("counter", "HTTP requests handled, by router and route."),
+    "http_request_errors_total": ("counter", "HTTP requests answered with a 5xx status."),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency."),
+    "http_requests_in_flight": ("gauge", "HTTP requests currently being handled."),
+    "db_queries_total": ("counter", "Database queries issued while handling requests."),
+    "db_query_seconds_total": ("counter", "Time spent in database queries while handling requests."),
+    "db_pool_size": ("gauge", "Configured connection pool size."),
+    "db_pool_checked_out": ("gauge", "Connections currently checked out of the pool."),
+    "db_pool_idle": ("gauge", "Idle connections in the pool."),
+    "db_pool_overflow": ("gauge", "Connections open beyond the pool size."),
+    "db_pool_waits_total": ("counter", "Connection checkouts."),
+    "db_pool_timeouts_total": ("counter", "Connection checkouts that timed out."),
+    "db_pool_wait_seconds_total": ("counter", "Time spent waiting to check out a connection."),
+    "db_pool_max_wait_seconds": ("gauge", "Longest single wait for a connection."),
+    "cache_hits_total": ("counter", "Cache lookups that found an entry."),
+    "cache_misses_total": ("counter", "Cache lookups that found nothing."),
+    "cache_evictions_total": ("counter", "Entries evicted to make room."),
+    "cache_entries": ("gauge", "Entries currently cached."),
+    "cache_hit_ratio": ("gauge", "Hits over lookups since start-up."),
+    "write_behind_pending": ("gauge", "Rows waiting in a write-behind buffer."),
+    "write_behind_flushed_total": ("counter", "Rows flushed from a write-behind buffer."),
+    "write_behind_dead_lettered_total": ("counter", "Rows dropped from a write-behind buffer after failing to write."),
+    "upload_bytes_total": ("counter", "Bytes received in uploads."),
+    "uploads_total": ("counter", "Files registered as course materials."),
+    "quiz_submissions_total": ("counter", "Quiz submissions graded."),
+}
+
+# Gauges that are combined across processes with max() rather than summed
+MAX_GAUGES = {"db_pool_max_wait_seconds"}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Process-local counters for events counted with inc(): (name, labels) -> value
+COUNTERS: Dict[Tuple[str, Labels], float] = defaultdict(float)
+
+def inc(name: str, amount: float = 1.0, **labels: str):
+    """Add to a counter declared in METRICS."""
+    COUNTERS[(name, tuple(sorted(labels.items())))] += amount
+
+def router_name(route: str) -> str:
+    """The router a route template belongs to: its first path segment."""
+    if route == "unmatched":
+        return route
+    return route.strip("/").split("/", 1)[0] or "root"
+
+def collect_local() -> dict:
+    """This process's metrics as {name: {labels: value}}; histogram values are [counts, sum, count]."""
+    metrics: dict = defaultdict(dict)
+    for (name, labels), value in COUNTERS.items():
+        metrics[name][labels] = value
+
+    for (method, route), stats in profiling.ROUTE_STATS.items():
+        labels = (("method", method), ("route", route), ("router", router_name(route)))
+        metrics["http_requests_total"][labels] = stats.latency.count
+        metrics["http_request_errors_total"][labels] = stats.errors
+        metrics["http_request_duration_seconds"][labels] = [list(stats.latency.counts), stats.latency.sum, stats.latency.count]
+        metrics["db_queries_total"][labels] = stats.db_queries
+        metrics["db_query_seconds_total"][labels] = stats.db_seconds
+    metrics["http_requests_in_flight"][()] = profiling.in_flight_requests
+
+    for pool_name, pool_engine in (("sync", engine), ("async", async_engine.sync_engine)):
+        snapshot = pool_stats(pool_engine)
+        labels = (("pool", pool_name),)
+        for key in ("size", "checked_out", "idle", "overflow"):
+            if key in snapshot:
+                metrics[f"db_pool_{key}"][labels] = snapshot[key]
+        pool = getattr(pool_engine.pool, "stats", None)
+        if pool is not None:
+            metrics["db_pool_waits_total"][labels] = pool.waits
+            metrics["db_pool_timeouts_total"][labels] = pool.timeouts
+            metrics["db_pool_wait_seconds_total"][labels] = pool.total_wait
+            metrics["db_pool_max_wait_seconds"][labels] = pool.max_wait
+
+    for cache_name, cache in CACHES.items():
+        stats = cache.stats()
+        labels = (("cache", cache_name),)
+        metrics["cache_hits_total"][labels] = stats["hits"]
+        metrics["cache_misses_total"][labels] = stats["misses"]
+        metrics["cache_evictions_total"][labels] = stats.get("evictions", 0)
+        metrics["cache_entries"][labels] = stats["entries"]
+
+    for buffer in BUFFERS:
+        stats = buffer.stats()
+        labels = (("buffer", buffer.name),)
+        metrics["write_behind_pending"][labels] = stats["pending"]
+        metrics["write_behind_flushed_total"][labels] = stats["flushed"]
+        metrics["write_behind_dead_lettered_total"][labels] = stats["dead_lettered"]
+    return metrics
+
+def merge(into: dict, metrics: dict, include_gauges: bool = True):
+    for name, samples in metrics.items():
+        kind = METRICS[name][0]
+        if kind == "gauge" and not include_gauges:
+            continue
+        target = into[name]
+        for labels, value in samples.items():
+            if labels not in target:
+                target[labels] = [list(value[0]), value[1], value[2]] if kind == "histogram" else value
+            elif kind == "histogram":
+                counts, total, count = target[labels]
+                target[labels] = [[a + b for a, b in zip(counts, value[0])], total + value[1], count + value[2]]
+            elif name in MAX_GAUGES:
+                target[labels] = max(target[labels], value)
+            else:
+                target[labels] += value
+
+def to_json(metrics: dict) -> dict:
+    return {name: [[list(map(list, labels)), value] for labels, value in samples.items()] for name, samples in metrics.items()}
+
+def from_json(data: dict) -> dict:
+    return {
+        name: {tuple(tuple(pair) for pair in labels): value for labels, value in samples}
+        for name, samples in data.items() if name in METRICS
+    }
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def write_snapshot(directory: Optional[str] = None):
+    """Write this process's metrics where the other workers can read them."""
+    directory = directory or METRICS_DIR
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as handle:
+        json.dump(to_json(collect_local()), handle)
+    os.replace(temp_path, os.path.join(directory, f"{os.getpid()}.json"))
+
+def collect(directory: Optional[str] = None) -> dict:
+    """Metrics of this process plus, with METRICS_DIR, every other worker's last snapshot."""
+    directory = directory or METRICS_DIR
+    metrics: dict = defaultdict(dict)
+    merge(metrics, collect_local())
+    if directory and os.path.isdir(directory):
+        for entry in os.scandir(directory):
+            name, extension = os.path.splitext(entry.name)
+            if extension != ".json" or not name.isdigit() or int(name) == os.getpid():
+                continue
+            try:
+                with open(entry.path) as handle:
+                    snapshot = from_json(json.load(handle))
+            except (OSError, ValueError):
+                continue  # Being replaced, or a leftover from a crash mid-write
+            merge(metrics, snapshot, include_gauges=process_alive(int(name)))
+
+    # Derived after aggregation so the ratio covers every process
+    for labels, hits in metrics.get("cache_hits_total", {}).items():
+        lookups = hits + metrics["cache_misses_total"].get(labels, 0)
+        metrics["cache_hit_ratio"][labels] = hits / lookups if lookups else 0.0
+    return metrics
+
+def format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render(metrics: dict) -> str:
+    """Prometheus text exposition format 0.0.4."""
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        samples = metrics.get(name)
+        if not samples:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(samples.items()):
+            if kind == "histogram":
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket in zip(profiling.LATENCY_BUCKETS, counts):
+                    cumulative += bucket
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', format_value(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {format_value(total)}")
+                lines.append(f"{name}_count{format_labels(labels)} {count}")
+            else:
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+_snapshot_task: Optional[asyncio.Task] = None
+
+async def _write_snapshots():
+    while True:
+        await asyncio.sleep(METRICS_SNAPSHOT_INTERVAL)
+        try:
+            write_snapshot()
+        except OSError:
+            logger.exception("Could not write metrics snapshot to %s", METRICS_DIR)
+
+def start_snapshots():
+    """Start writing snapshots in the background; a no-op without METRICS_DIR."""
+    global _snapshot_task
+    if METRICS_DIR and _snapshot_task is None:
+        _snapshot_task = asyncio.create_task(_write_snapshots())
+
+async def stop_snapshots():
+    """Stop the background writer and leave a final snapshot behind."""
+    global _snapshot_task
+    if _snapshot_task is not None:
+        _snapshot_task.cancel()
+        try:
+            await _snapshot_task
+        except asyncio.CancelledError:
+            pass
+        _snapshot_task = None
+    write_snapshot()
@@ -2,7 +2,7 @@ from sqlalchemy import Column, Integer, String
 from app.db import Base
 
 class Course(Base):
-    _tablename_ = "courses"
+    __tablename__ = "courses"
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
     description = Column(String)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Float, Index, Integer, String, Text
+from app.db import Base
+
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(Float, nullable=False)  # Unix time the job becomes eligible to run
+    started_at = Column(Float)
+    leased_at = Column(Float)  # Last time the worker running the job renewed its lease
+    finished_at = Column(Float)
+    result = Column(Text)  # JSON
+    error = Column(Text)
+
+    # Workers look for the oldest eligible job of a type, and count running jobs per type
+    __table_args__ = (Index("ix_jobs_status_type_run_after", "status", "job_type", "run_after"),)
@@ -0,0 +1,14 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer, String
+from app.db import Base
+
+class Blob(Base):
+    __tablename__ = "blobs"
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(BigInteger)
+    ref_count = Column(Integer, default=0, nullable=False)
+
+class Material(Base):
+    __tablename__ = "materials"
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String, unique=True, index=True, nullable=False)
+    sha256 = Column(String(64), ForeignKey("blobs.sha256"), index=True, nullable=False)
@@ -1,16 +1,76 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Index
+from sqlalchemy.orm import relationship
 from app.db import Base
 
 class Quiz(Base):
-    _tablename_ = "quizzes"
+    __tablename__ = "quizzes"
     id = Column(Integer, primary_key=True)
-    course_id = Column(Integer, ForeignKey("courses.id"))
-    question = Column(String)
-    answer = Column(String)
+    course_id = Column(Integer, ForeignKey("courses.id"), index=True)
+    title = Column(String, nullable=False)
+    description = Column(String)
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every edit; drives ETags and caches
+    questions = relationship(
+        "Question", back_populates="quiz", order_by="Question.position", cascade="all, delete-orphan",
+    )
+
+class Question(Base):
+    __tablename__ = "quiz_questions"
+    id = Column(Integer, primary_key=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False)  # 0-based; this is the question_id clients submit
+    question_text = Column(String, nullable=False)
+    correct_answer = Column(Integer, nullable=False)  # Position of the correct option
+    quiz = relationship("Quiz", back_populates="questions")
+    options = relationship(
+        "QuestionOption", back_populates="question", order_by="QuestionOption.position", cascade="all, delete-orphan",
+    )
+
+    # One question per position in a quiz; also serves loading a quiz's questions in order
+    __table_args__ = (Index("ix_quiz_questions_quiz_position", "quiz_id", "position", unique=True),)
+
+class QuestionOption(Base):
+    __tablename__ = "quiz_options"
+    id = Column(Integer, primary_key=True)
+    question_id = Column(Integer, ForeignKey("quiz_questions.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)
+    text = Column(String, nullable=False)
+    question = relationship("Question", back_populates="options")
+
+class QuizScore(Base):
+    __tablename__ = "quiz_scores"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False, index=True)
+    score = Column(Integer, nullable=False)
+    submitted_at = Column(Float)
+
+    # One score per user and quiz; resubmitting replaces it. The leaderboard index lets a
+    # quiz's top-N scores be read straight off the index without sorting.
+    __table_args__ = (
+        Index("ix_quiz_scores_user_quiz", "user_id", "quiz_id", unique=True),
+        Index("ix_quiz_scores_leaderboard", "quiz_id", score.desc(), "submitted_at"),
+    )
+
+class QuizStats(Base):
+    """Running totals per quiz, maintained as scores are written."""
+    __tablename__ = "quiz_stats"
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+    submissions = Column(Integer, nullable=False, default=0)  # Users with a score
+    total_score = Column(Integer, nullable=False, default=0)
+
+class QuizScoreBucket(Base):
+    """Histogram of current scores per quiz: how many users hold each score."""
+    __tablename__ = "quiz_score_buckets"
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
 
 class Progress(Base):
-    _tablename_ = "progress"
+    __tablename__ = "progress"
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     course_id = Column(Integer, ForeignKey("courses.id"))
-    completed = Column(Integer, default=0)
\ No newline at end of file
+    completed = Column(Integer, default=0)
+
+    # One progress row per user and course, so updates can be upserted in bulk
+    __table_args__ = (Index("ix_progress_user_course", "user_id", "course_id", unique=True),)
@@ -2,8 +2,9 @@ from sqlalchemy import Column, Integer, String
 from app.db import Base
 
 class User(Base):
-    _tablename_ = "users"
+    __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
+    username = Column(String, unique=True, index=True, nullable=False)
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     role = Column(String, default="student")
\ No newline at end of file
@@ -0,0 +1,214 @@
+# Backend/app/profiling.py
+
+"""Per-request timing, database query accounting and sampled profiling.
+
+RequestTimingMiddleware times every HTTP request. It records a latency histogram per
+route template (e.g. "GET /courses/{course_id}") and adds a Server-Timing header with
+the total time and the time spent in the database, which browser dev tools show next to
+the request. Database time is measured by SQLAlchemy cursor events on engines passed to
+instrument_engine(), and charged to the request that issued the query.
+
+A request issuing more than QUERY_COUNT_WARNING queries, or repeating one statement more
+than QUERY_REPEAT_WARNING times (the usual N+1 shape), is logged as a warning.
+
+When PROFILE_SAMPLE_RATE > 0, that fraction of requests runs under cProfile, and the
+profile is written to PROFILE_DIR if the request took longer than PROFILE_SLOW_MS. Only
+one request is profiled at a time, and cProfile sees everything on the event loop thread
+while it runs, so profiles of concurrent requests overlap.
+"""
+
+import bisect
+import cProfile
+import logging
+import os
+import random
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_WARNING = int(os.getenv("QUERY_COUNT_WARNING", "20"))
+QUERY_REPEAT_WARNING = int(os.getenv("QUERY_REPEAT_WARNING", "10"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "500"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+
+# Upper bounds in seconds, Prometheus-style; the last bucket catches everything slower
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+class Histogram:
+    """Counts of observations per bucket, plus their count and sum."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+class RouteStats:
+    """What every request to one route has cost so far."""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.errors = 0  # Responses with a 5xx status
+
+    def to_dict(self) -> dict:
+        count = self.latency.count
+        return {
+            "count": count,
+            "errors": self.errors,
+            "avg_ms": round(self.latency.sum / count * 1000, 3) if count else 0.0,
+            "p50_ms": self.latency.quantile(0.5) * 1000 if count else 0.0,
+            "p95_ms": self.latency.quantile(0.95) * 1000 if count else 0.0,
+            "p99_ms": self.latency.quantile(0.99) * 1000 if count else 0.0,
+            "db_queries_per_request": round(self.db_queries / count, 3) if count else 0.0,
+            "db_ms_per_request": round(self.db_seconds / count * 1000, 3) if count else 0.0,
+        }
+
+# (method, route template) -> RouteStats. Only touched from the event loop thread.
+ROUTE_STATS: Dict[Tuple[str, str], RouteStats] = {}
+in_flight_requests = 0
+
+class RequestStats:
+    """Database work done on behalf of the current request."""
+
+    __slots__ = ("queries", "db_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements: Counter = Counter()
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        stats.statements[statement] += 1
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+def instrument_engine(engine):
+    """Charge queries run on a (sync) engine to the current request. Safe to call twice."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+def route_name(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+
+def server_timing(total: float, stats: RequestStats) -> str:
+    return (
+        f'app;dur={total * 1000:.1f}, '
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+    )
+
+def write_profile(profiler: cProfile.Profile, method: str, route: str, elapsed: float) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    path = os.path.join(PROFILE_DIR, f"{int(time.time() * 1000)}-{method}-{slug}-{elapsed * 1000:.0f}ms.prof")
+    profiler.dump_stats(path)
+    return path
+
+class RequestTimingMiddleware:
+    """ASGI middleware recording route latency, database cost and slow-request profiles."""
+
+    def __init__(self, app):
+        self.app = app
+        self._profiling = False
+
+    async def __call__(self, scope, receive, send):
+        global in_flight_requests
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        profiler = None
+        if PROFILE_SAMPLE_RATE > 0 and not self._profiling and random.random() < PROFILE_SAMPLE_RATE:
+            self._profiling = True
+            profiler = cProfile.Profile()
+            profiler.enable()
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(time.perf_counter() - start, stats).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        in_flight_requests += 1
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            in_flight_requests -= 1
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+            self.record(scope, stats, elapsed, status_code, profiler)
+
+    def record(self, scope, stats: RequestStats, elapsed: float, status_code: int, profiler):
+        method, route = scope["method"], route_name(scope)
+        route_stats = ROUTE_STATS.get((method, route))
+        if route_stats is None:
+            route_stats = ROUTE_STATS[(method, route)] = RouteStats()
+        route_stats.latency.observe(elapsed)
+        route_stats.db_queries += stats.queries
+        route_stats.db_seconds += stats.db_seconds
+        if status_code >= 500:
+            route_stats.errors += 1
+
+        if stats.queries > QUERY_COUNT_WARNING:
+            logger.warning("%s %s ran %s queries (%.1f ms in the database)", method, route, stats.queries, stats.db_seconds * 1000)
+        if stats.statements:
+            statement, repeats = stats.statements.most_common(1)[0]
+            if repeats > QUERY_REPEAT_WARNING:
+                logger.warning("Possible N+1 in %s %s: statement ran %s times: %s", method, route, repeats, statement[:200])
+        if profiler is not None and elapsed * 1000 >= PROFILE_SLOW_MS:
+            path = write_profile(profiler, method, route, elapsed)
+            logger.info("Profiled slow request %s %s (%.0f ms): %s", method, route, elapsed * 1000, path)
+
+def route_stats() -> List[dict]:
+    """Snapshot of ROUTE_STATS, slowest average first."""
+    rows = [{"method": method, "route": route, **stats.to_dict()} for (method, route), stats in ROUTE_STATS.items()]
+    return sorted(rows, key=lambda row: row["avg_ms"], reverse=True)
@@ -0,0 +1,33 @@
+# Backend/app/responses.py
+
+"""JSON encoding for API responses.
+
+orjson is used when it is installed, and is several times faster than the standard
+library on large payloads such as course listings. Without it, encoding falls back to
+compact json.dumps, so orjson stays an optional dependency.
+"""
+
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only where orjson is missing
+    orjson = None
+
+def json_bytes(content: Any) -> bytes:
+    """Encode plain JSON data (dicts, lists, str, int, float, bool, None) to UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that encodes with orjson when available.
+
+    Handlers that already hold plain data (e.g. a cached course page) can return this
+    directly to skip FastAPI's jsonable_encoder pass as well.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return json_bytes(content)
@@ -1,52 +1,130 @@
 # Backend/app/routers/auth.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
-from passlib.context import CryptContext
-from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import LRUCache, register_cache
+from app.db import conflict_insert, get_async_db
+from app.models.user import User as UserModel
 
 # Models (for request bodies)
 class User(BaseModel):
     username: str
     password: str
 
+class UserRegistration(User):
+    email: Optional[str] = None
+
 class UserInDB(User):
     hashed_password: str
 
 # FastAPI router instance
 router = APIRouter()
 
-# Dependency to get the current user
-def get_user_from_db(username: str):
-    # Replace this with actual database query to get the user
-    fake_user_db = {
-        "testuser": {
-            "username": "testuser",
-            "hashed_password": "$2b$12$ZPEnZCmCjPyqHyj5RAfBTeTdeX3H5v5VpdQzI6k1/hY1gzXck1iZe",  # hashed 'password'
-        }
-    }
-    return fake_user_db.get(username)
+# Look a user up by username (served by the unique index on users.username)
+async def get_user_from_db(db: AsyncSession, username: str) -> Optional[UserModel]:
+    result = await db.execute(select(UserModel).where(UserModel.username == username))
+    return result.scalar_one_or_none()
+
+# Insert users in chunks, skipping usernames or emails that already exist.
+# Each row needs username and hashed_password; email and role are optional.
+async def import_users(db: AsyncSession, users: Iterable[dict], chunk_size: int = 1000) -> int:
+    inserted = 0
+    chunk = []
+    for row in users:
+        chunk.append({"email": None, "role": "student", **row})
+        if len(chunk) >= chunk_size:
+            inserted += await _insert_user_chunk(db, chunk)
+            chunk = []
+    if chunk:
+        inserted += await _insert_user_chunk(db, chunk)
+    await db.commit()
+    return inserted
+
+async def _insert_user_chunk(db: AsyncSession, chunk: list) -> int:
+    result = await db.execute(conflict_insert(db, UserModel.__table__).on_conflict_do_nothing(), chunk)
+    return result.rowcount
+
+# Password hashing context (bcrypt cost is 2**BCRYPT_ROUNDS iterations). passlib and jose
+# are imported on first use, or by warm_up() during start-up, to keep importing the app fast.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = None
+
+def get_pwd_context():
+    global pwd_context
+    if pwd_context is None:
+        from passlib.context import CryptContext
+        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+    return pwd_context
+
+# Load passlib's bcrypt backend and jose ahead of the first sign-in; blocking, run it in a thread
+def warm_up():
+    get_pwd_context().handler().get_backend()
+    import jose.jwt  # noqa: F401
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop.
+# Jobs beyond PASSWORD_QUEUE_LIMIT (running + waiting) are turned away with a 503.
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "4"))
+PASSWORD_QUEUE_LIMIT = int(os.getenv("PASSWORD_QUEUE_LIMIT", "64"))
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_WORKERS, thread_name_prefix="password")
+pending_password_jobs = 0
 
 # JWT settings
 SECRET_KEY = "7a0e0848f8298c2c0a3b8f256f7174239a6fdbd9d76265d0b760019ff351f5ff"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+
+# Verified tokens -> decoded claims, keyed on the token digest; each entry expires with its token
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+token_cache = register_cache("tokens", LRUCache(max_entries=TOKEN_CACHE_SIZE))
+
 # Function to hash passwords
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 # Function to verify passwords
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+# Run a password hashing job on the password executor, rejecting it if the queue is full
+async def run_password_job(func, *args):
+    global pending_password_jobs
+    if pending_password_jobs >= PASSWORD_QUEUE_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in requests, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    pending_password_jobs += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, partial(func, *args))
+    finally:
+        pending_password_jobs -= 1
+
+# Async variants of the password helpers for use inside request handlers
+async def hash_password_async(password: str) -> str:
+    return await run_password_job(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await run_password_job(verify_password, plain_password, hashed_password)
 
 # Function to create JWT access token
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)) -> str:
+    from jose import jwt
     to_encode = data.copy()
     expire = datetime.utcnow() + expires_delta
     to_encode.update({"exp": expire})
@@ -55,49 +133,82 @@ def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes
 
 # User registration endpoint
 @router.post("/register")
-async def register(user: User):
+async def register(user: UserRegistration, db: AsyncSession = Depends(get_async_db)):
     """Register a new user."""
-    fake_user_db = {
-        "testuser": {
-            "username": "testuser",
-            "hashed_password": "$2b$12$ZPEnZCmCjPyqHyj5RAfBTeTdeX3H5v5VpdQzI6k1/hY1gzXck1iZe",  # Example hashed password
-        }
-    }
-
-    if user.username in fake_user_db:
+    hashed_password = await hash_password_async(user.password)
+    db.add(UserModel(username=user.username, email=user.email, hashed_password=hashed_password))
+    try:
+        # The unique indexes on username/email reject duplicates, so there is no separate existence check
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already registered")
-    
-    hashed_password = hash_password(user.password)
-    fake_user_db[user.username] = {"username": user.username, "hashed_password": hashed_password}
     return {"message": "User registered successfully!"}
 
 # User login endpoint
 @router.post("/login")
-async def login(user: User):
+async def login(user: User, db: AsyncSession = Depends(get_async_db)):
     """Login and return a JWT token."""
-    db_user = get_user_from_db(user.username)
+    db_user = await get_user_from_db(db, user.username)
     if not db_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password")
     
-    if not verify_password(user.password, db_user["hashed_password"]):
+    if not await verify_password_async(user.password, db_user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password")
     
     access_token = create_access_token(data={"sub": user.username})
     return {"access_token": access_token, "token_type": "bearer"}
 
-# Function to get the current user from JWT token
-async def get_current_user(token: str = Depends(...)):
-    """Get current user based on token."""
-    credentials_exception = HTTPException(
+# Build the 401 raised for missing, invalid or expired tokens
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+# Decode a JWT, reusing the claims of tokens that were already verified and have not expired
+def decode_token(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).hexdigest()
+    claims = token_cache.get(key)
+    if claims is not None:
+        return claims
+    from jose import JWTError, jwt
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        return username
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception()
+    if "exp" in claims:
+        token_cache.set(key, claims, ttl=claims["exp"] - time.time())
+    return claims
+
+# Dependency returning the verified claims, decoded at most once per request
+async def get_token_claims(request: Request, token: str = Depends(oauth2_scheme)) -> dict:
+    claims = getattr(request.state, "token_claims", None)
+    if claims is None:
+        claims = decode_token(token)
+        request.state.token_claims = claims
+    return claims
+
+# Function to get the current user from JWT token
+async def get_current_user(claims: dict = Depends(get_token_claims)):
+    """Get current user based on token."""
+    username: Optional[str] = claims.get("sub")
+    if username is None:
+        raise credentials_exception()
+    return username
+
+# Dependency returning the signed-in user's row; a token for a user that no longer exists is rejected
+async def get_current_db_user(username: str = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)) -> UserModel:
+    user = await get_user_from_db(db, username)
+    if user is None:
+        raise credentials_exception()
+    return user
+
+# Dependency factory restricting a route to signed-in users holding one of the given roles
+def require_role(*roles: str):
+    async def check_role(user: UserModel = Depends(get_current_db_user)) -> UserModel:
+        if user.role not in roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not permitted for this role")
+        return user
+    return check_role
@@ -1,14 +1,193 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.db import get_db
+import base64
+import binascii
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import course_cache
+from app.db import conflict_insert, get_async_db
+from app.http_cache import conditional_response, make_etag
 from app.models.course import Course
+from app.models.quiz import Progress
+from app.responses import FastJSONResponse
+from app.schemas.course import CourseDetails, CourseDetailsUpdate, CoursePage, CourseProgress, CourseRead
+from app.search import search_courses
+from app.write_behind import WriteBehindBuffer
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 
-@router.get("/")
-def list_courses(db: Session = Depends(get_db)):
-    return db.query(Course).all()
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Shared caches may keep course bodies but must revalidate them with the ETag
+COURSE_CACHE_CONTROL = "public, no-cache"
+
+# Columns a client may ask for in ?fields=; id is always returned since the cursor is built from it
+COURSE_FIELDS = {column.name: column for column in Course.__table__.columns}
+
+def encode_cursor(course_id: int) -> str:
+    """Turn the last course id of a page into an opaque cursor token."""
+    return base64.urlsafe_b64encode(str(course_id).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    """Recover the course id (or search offset) from a cursor token produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value = base64.urlsafe_b64decode(padded.encode()).decode()
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        value = ""
+    # Only plain non-negative integers; int() alone would also take "-1", " 1" or "1_000"
+    if not (value.isascii() and value.isdigit()):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return int(value)
+
+def parse_fields(fields: Optional[str]) -> list:
+    """Map a comma-separated ?fields= value onto Course columns."""
+    if not fields:
+        return list(COURSE_FIELDS.values())
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in COURSE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown course fields: {', '.join(unknown)}")
+    return [COURSE_FIELDS["id"]] + [COURSE_FIELDS[name] for name in names if name != "id"]
+
+def course_to_dict(course: Course) -> dict:
+    """Plain-data copy of a course row, safe to keep in the cache after the session closes."""
+    return {name: getattr(course, name) for name in COURSE_FIELDS}
+
+def course_key(course_id: int) -> str:
+    return f"course:{course_id}"
+
+def course_page_key(limit: int, after: Optional[str], fields: Optional[str]) -> str:
+    return f"courses:page:{limit}:{after or ''}:{fields or ''}"
+
+def invalidate_course(course_id: Optional[int] = None):
+    """Drop cached entries affected by a course write.
+
+    Only this worker's cache is cleared; other workers catch up when their entries expire,
+    after at most COURSE_CACHE_TTL seconds (see app/cache.py).
+    """
+    if course_id is not None:
+        course_cache.delete(course_key(course_id))
+    course_cache.delete_prefix("courses:page:")
+
+async def save_progress(db: AsyncSession, rows: list):
+    """Upsert (user_id, course_id, completed) rows in one statement."""
+    upsert = conflict_insert(db, Progress)
+    await db.execute(
+        upsert.on_conflict_do_update(
+            index_elements=[Progress.user_id, Progress.course_id],
+            set_={"completed": upsert.excluded.completed},
+        ),
+        rows,
+    )
+    await db.commit()
+
+# Progress updates are written behind the request, coalesced per (user_id, course_id); see app/write_behind.py
+progress_buffer = WriteBehindBuffer("course_progress", save_progress)
+
+async def load_course_page(db: AsyncSession, limit: int, after: Optional[str], fields: Optional[str]) -> dict:
+    """One page of the course listing, from the cache or the database."""
+    key = course_page_key(limit, after, fields)
+    page = course_cache.get(key)
+    if page is not None:
+        return page
+
+    columns = parse_fields(fields)
+    query = select(*columns).order_by(Course.id).limit(limit + 1)
+    if after is not None:
+        query = query.where(Course.id > decode_cursor(after))
+
+    rows = (await db.execute(query)).mappings().all()
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = encode_cursor(items[-1]["id"]) if len(rows) > limit else None
+    page = {"items": items, "next_cursor": next_cursor}
+    course_cache.set(key, page)
+    return page
+
+async def warm_cache(db: AsyncSession):
+    """Cache the first page of the listing, the page every visitor starts on."""
+    await load_course_page(db, DEFAULT_PAGE_SIZE, None, None)
+
+@router.get("/", response_model=CoursePage)
+async def list_courses(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """List courses a page at a time, ordered by id, using keyset pagination."""
+    # Pages are plain data built from the selected columns, so they are encoded directly
+    # rather than walked by jsonable_encoder; CoursePage documents the shape
+    return FastJSONResponse(await load_course_page(db, limit, after, fields))
+
+@router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Search course titles and descriptions; every word matches as a prefix, best matches first."""
+    offset = decode_cursor(after) if after is not None else 0
+    matches = await search_courses(db, q, limit + 1, offset)
+    page = matches[:limit]
+    courses = {
+        course.id: course
+        for course in (await db.scalars(select(Course).where(Course.id.in_([course_id for course_id, _ in page]))))
+    }
+    items = [
+        {**course_to_dict(courses[course_id]), "score": score} for course_id, score in page if course_id in courses
+    ]
+    # Ranked results have no stable key to seek from, so the cursor carries the offset
+    next_cursor = encode_cursor(offset + limit) if len(matches) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.post("/progress", status_code=status.HTTP_202_ACCEPTED)
+async def update_progress(progress: CourseProgress):
+    """Record a student's progress through a course; only the latest value per course is kept."""
+    row = {"user_id": progress.student_id, "course_id": progress.course_id, "completed": round(progress.progress)}
+    await progress_buffer.add((progress.student_id, progress.course_id), row)
+    return {"message": "Progress recorded."}
 
 @router.get("/{course_id}")
-def get_course(course_id: int, db: Session = Depends(get_db)):
-    return db.query(Course).filter(Course.id == course_id).first()
\ No newline at end of file
+async def get_course(course_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    entry = course_cache.get(course_key(course_id))
+    if entry is None:
+        course = await db.get(Course, course_id)
+        if course is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+        data = course_to_dict(course)
+        entry = {"course": data, "etag": make_etag(data)}
+        course_cache.set(course_key(course_id), entry)
+    return conditional_response(request, entry["course"], entry["etag"], COURSE_CACHE_CONTROL)
+
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=CourseRead)
+async def create_course(details: CourseDetails, db: AsyncSession = Depends(get_async_db)):
+    course = Course(**details.model_dump())
+    db.add(course)
+    await db.commit()
+    invalidate_course()
+    return course
+
+@router.put("/{course_id}", response_model=CourseRead)
+async def update_course(course_id: int, details: CourseDetailsUpdate, db: AsyncSession = Depends(get_async_db)):
+    course = await db.get(Course, course_id)
+    if course is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    for name, value in details.model_dump(exclude_unset=True).items():
+        setattr(course, name, value)
+    await db.commit()
+    invalidate_course(course_id)
+    return course
+
+@router.delete("/{course_id}", response_model=CourseRead)
+async def delete_course(course_id: int, db: AsyncSession = Depends(get_async_db)):
+    course = await db.get(Course, course_id)
+    if course is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    data = course_to_dict(course)
+    await db.delete(course)
+    await db.commit()
+    invalidate_course(course_id)
+    return data
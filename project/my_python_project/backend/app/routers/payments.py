@@ -1,15 +1,24 @@
 import os
-import stripe
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
-stripe.api_key = os.getenv("STRIPE_SECRET")
+# The stripe package (and the httpx client it brings along) is slow to import and only
+# checkout needs it, so it is imported on the first checkout rather than at start-up
+stripe = None
+
+def get_stripe():
+    global stripe
+    if stripe is None:
+        import stripe as stripe_module
+        stripe_module.api_key = os.getenv("STRIPE_SECRET")
+        stripe = stripe_module
+    return stripe
 
 @router.post("/create-checkout-session")
 def create_checkout_session(course_id: int):
-    checkout = stripe.checkout.Session.create(
+    checkout = get_stripe().checkout.Session.create(
         payment_method_types=['card'],
         line_items=[{
             'price_data': {
@@ -1,8 +1,24 @@
 # Backend/app/routers/quizzes.py
 
-from fastapi import APIRouter, HTTPException, status
-from pydantic import BaseModel
-from typing import List, Dict
+import operator
+import os
+import time
+from collections import Counter, defaultdict
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import BaseModel, TypeAdapter
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.cache import LRUCache, register_cache
+from app.db import conflict_insert, get_async_db
+from app import metrics
+from app.http_cache import encoded_response, make_etag, not_modified
+from app.models import quiz as models
+from app.models.user import User as UserModel
+from app.routers.auth import get_current_db_user, require_role
+from app.schemas.quiz import QuizSummary, StudentQuiz
+from app.write_behind import WriteBehindBuffer
 
 # Initialize the APIRouter instance
 router = APIRouter()
@@ -17,6 +33,7 @@ class Quiz(BaseModel):
     title: str
     description: str
     questions: List[Question]
+    course_id: Optional[int] = None
 
 class Answer(BaseModel):
     question_id: int
@@ -26,53 +43,354 @@ class QuizSubmission(BaseModel):
     quiz_id: int
     answers: List[Answer]
 
-# In-memory quiz data storage (use a database in production)
-quizzes_db: Dict[int, Quiz] = {}
-user_scores_db: Dict[int, Dict[int, int]] = {}  # user_scores_db[user_id][quiz_id] = score
-quiz_counter = 0  # A simple counter for quiz IDs
+class UserQuizSubmission(QuizSubmission):
+    user_id: int
+
+class BulkQuizSubmission(BaseModel):
+    submissions: List[UserQuizSubmission]
+
+# Quizzes are served without their answers, so shared caches may keep them; clients must revalidate
+QUIZ_CACHE_CONTROL = "public, no-cache"
+
+DEFAULT_LEADERBOARD_SIZE = 10
+MAX_LEADERBOARD_SIZE = 100
+
+# Load a quiz with its questions and their options in three batched queries (no per-question N+1)
+QUIZ_WITH_QUESTIONS = selectinload(models.Quiz.questions).selectinload(models.Question.options)
+
+# Compiled answer keys: "quiz_id:version" -> tuple of correct option indexes in question order.
+# Keys embed the version, so an edit made through any worker makes older keys unreachable.
+ANSWER_KEY_CACHE_SIZE = int(os.getenv("ANSWER_KEY_CACHE_SIZE", "4096"))
+answer_key_cache = register_cache("quiz_answer_keys", LRUCache(max_entries=ANSWER_KEY_CACHE_SIZE, ttl=3600))
+
+# Serialized student views: "quiz_id:version" -> JSON bytes, and "list:<etag>" for the listing.
+# Reads are served straight from these bytes, with no ORM loading or response validation.
+QUIZ_PAYLOAD_CACHE_SIZE = int(os.getenv("QUIZ_PAYLOAD_CACHE_SIZE", "1024"))
+quiz_payload_cache = register_cache("quiz_payloads", LRUCache(max_entries=QUIZ_PAYLOAD_CACHE_SIZE, ttl=3600))
+
+def quiz_etag(quiz_id: int, version: int) -> str:
+    return make_etag([quiz_id, version])
+
+# Serializes the listing straight to JSON bytes in pydantic's core
+quiz_summaries = TypeAdapter(List[QuizSummary])
+
+def student_view(quiz: models.Quiz) -> bytes:
+    """What a student taking the quiz sees, encoded: questions and options, never the answers."""
+    return StudentQuiz.model_validate(quiz).model_dump_json().encode("utf-8")
+
+async def load_quiz(db: AsyncSession, quiz_id: int) -> models.Quiz:
+    result = await db.execute(select(models.Quiz).where(models.Quiz.id == quiz_id).options(QUIZ_WITH_QUESTIONS))
+    quiz = result.scalar_one_or_none()
+    if quiz is None:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    return quiz
+
+async def get_answer_keys(db: AsyncSession, quiz_ids: Iterable[int]) -> Dict[int, Tuple[int, ...]]:
+    """Answer keys for the given quizzes, compiling any that are not cached in one batched query."""
+    quiz_ids = set(quiz_ids)
+    versions = dict((await db.execute(
+        select(models.Quiz.id, models.Quiz.version).where(models.Quiz.id.in_(quiz_ids))
+    )).all())
+    keys = {}
+    for quiz_id, version in versions.items():
+        cached = answer_key_cache.get(f"{quiz_id}:{version}")
+        if cached is not None:
+            keys[quiz_id] = cached
+    missing = [quiz_id for quiz_id in versions if quiz_id not in keys]
+    if missing:
+        compiled: Dict[int, list] = {quiz_id: [] for quiz_id in missing}
+        rows = await db.execute(
+            select(models.Question.quiz_id, models.Question.correct_answer)
+            .where(models.Question.quiz_id.in_(missing))
+            .order_by(models.Question.quiz_id, models.Question.position)
+        )
+        for quiz_id, correct_answer in rows:
+            compiled[quiz_id].append(correct_answer)
+        for quiz_id, answers in compiled.items():
+            keys[quiz_id] = tuple(answers)
+            answer_key_cache.set(f"{quiz_id}:{versions[quiz_id]}", keys[quiz_id])
+    return keys
+
+# Quizzes whose answer keys are compiled during start-up (see warm_cache)
+WARM_ANSWER_KEYS = int(os.getenv("WARM_ANSWER_KEYS", "256"))
+
+async def warm_cache(db: AsyncSession):
+    """Compile the answer keys of the newest quizzes, so their first submissions skip the query."""
+    quiz_ids = (await db.scalars(
+        select(models.Quiz.id).order_by(models.Quiz.id.desc()).limit(min(WARM_ANSWER_KEYS, ANSWER_KEY_CACHE_SIZE))
+    )).all()
+    if quiz_ids:
+        await get_answer_keys(db, quiz_ids)
+
+def grade(answer_key: Tuple[int, ...], answers: List[Answer]) -> Tuple[int, List[bool]]:
+    """Score answers against a compiled key; returns the score and per-question correctness.
+
+    Answers are laid out into an array aligned with the key, so each question counts at
+    most once (the last answer to a question wins) and out-of-range ids are ignored.
+    """
+    selected = [-1] * len(answer_key)
+    for answer in answers:
+        if 0 <= answer.question_id < len(selected):
+            selected[answer.question_id] = answer.selected_answer
+    correct = list(map(operator.eq, answer_key, selected))
+    return sum(correct), correct
+
+async def update_score_aggregates(db: AsyncSession, scores: List[dict], previous: Dict[Tuple[int, int], int]):
+    """Apply a batch of new scores to the per-quiz totals and histograms.
+
+    Each score replaces the user's previous one (previous maps (user_id, quiz_id) to it),
+    so the previous score is taken out of its bucket and the total, and only users scoring
+    a quiz for the first time add to the submission count. Runs in the caller's transaction.
+    """
+    submissions: Counter = Counter()
+    totals: Counter = Counter()
+    buckets: Dict[int, Counter] = defaultdict(Counter)
+    for row in scores:
+        quiz_id, score = row["quiz_id"], row["score"]
+        old = previous.get((row["user_id"], quiz_id))
+        if old is None:
+            submissions[quiz_id] += 1
+        else:
+            totals[quiz_id] -= old
+            buckets[quiz_id][old] -= 1
+        totals[quiz_id] += score
+        buckets[quiz_id][score] += 1
+
+    # Increments are applied in SQL, so concurrent flushes from other workers add up
+    upsert = conflict_insert(db, models.QuizStats)
+    await db.execute(
+        upsert.on_conflict_do_update(
+            index_elements=[models.QuizStats.quiz_id],
+            set_={
+                "submissions": models.QuizStats.submissions + upsert.excluded.submissions,
+                "total_score": models.QuizStats.total_score + upsert.excluded.total_score,
+            },
+        ),
+        [
+            {"quiz_id": quiz_id, "submissions": submissions[quiz_id], "total_score": totals[quiz_id]}
+            for quiz_id in buckets
+        ],
+    )
+    changed = [
+        {"quiz_id": quiz_id, "score": score, "count": delta}
+        for quiz_id, deltas in buckets.items() for score, delta in deltas.items() if delta
+    ]
+    if changed:
+        upsert = conflict_insert(db, models.QuizScoreBucket)
+        await db.execute(
+            upsert.on_conflict_do_update(
+                index_elements=[models.QuizScoreBucket.quiz_id, models.QuizScoreBucket.score],
+                set_={"count": models.QuizScoreBucket.count + upsert.excluded.count},
+            ),
+            changed,
+        )
+
+async def save_scores(db: AsyncSession, scores: List[dict]):
+    """Write (user_id, quiz_id, score, submitted_at) rows, replacing earlier attempts, and update the aggregates."""
+    # Only the last score per (user, quiz) in a batch counts
+    scores = list({(row["user_id"], row["quiz_id"]): row for row in scores}.values())
+    key = (models.QuizScore.user_id, models.QuizScore.quiz_id)
+
+    # First attempts are whatever this insert creates. A concurrent flush inserting the same
+    # key waits on the new row and then skips it, so each first attempt is counted once.
+    insert_new = conflict_insert(db, models.QuizScore).on_conflict_do_nothing(index_elements=key).returning(*key)
+    created = {tuple(row) for row in await db.execute(insert_new, scores)}
+    rescored = [row for row in scores if (row["user_id"], row["quiz_id"]) not in created]
+
+    # The other rows already exist: lock them, read the scores they replace, then overwrite them
+    previous: Dict[Tuple[int, int], int] = {}
+    if rescored:
+        previous = {
+            (user_id, quiz_id): score
+            for user_id, quiz_id, score in await db.execute(
+                select(*key, models.QuizScore.score)
+                .where(tuple_(*key).in_([(row["user_id"], row["quiz_id"]) for row in rescored]))
+                .with_for_update()
+            )
+        }
+        upsert = conflict_insert(db, models.QuizScore)
+        await db.execute(
+            upsert.on_conflict_do_update(
+                index_elements=key,
+                set_={"score": upsert.excluded.score, "submitted_at": upsert.excluded.submitted_at},
+            ),
+            rescored,
+        )
+    await update_score_aggregates(db, scores, previous)
+    await db.commit()
+
+# Scores are written behind the request, coalesced per (user_id, quiz_id); see app/write_behind.py
+score_buffer = WriteBehindBuffer("quiz_scores", save_scores)
+
+async def record_score(user_id: int, quiz_id: int, score: int):
+    metrics.inc("quiz_submissions_total")
+    await score_buffer.add(
+        (user_id, quiz_id), {"user_id": user_id, "quiz_id": quiz_id, "score": score, "submitted_at": time.time()},
+    )
+
+def build_questions(quiz: Quiz) -> List[models.Question]:
+    return [
+        models.Question(
+            position=position,
+            question_text=question.question_text,
+            correct_answer=question.correct_answer,
+            options=[models.QuestionOption(position=index, text=text) for index, text in enumerate(question.options)],
+        )
+        for position, question in enumerate(quiz.questions)
+    ]
 
 # Endpoint to create a quiz
 @router.post("/create_quiz", status_code=status.HTTP_201_CREATED)
-async def create_quiz(quiz: Quiz):
-    global quiz_counter
-    quiz_id = quiz_counter
-    quizzes_db[quiz_id] = quiz
-    quiz_counter += 1
+async def create_quiz(quiz: Quiz, db: AsyncSession = Depends(get_async_db)):
+    db_quiz = models.Quiz(
+        title=quiz.title,
+        description=quiz.description,
+        course_id=quiz.course_id,
+        version=1,
+        questions=build_questions(quiz),
+    )
+    db.add(db_quiz)
+    await db.flush()
+    quiz_id = db_quiz.id
+    await db.commit()
     return {"quiz_id": quiz_id, "message": "Quiz created successfully."}
 
-# Endpoint to get a list of quizzes
-@router.get("/get_quizzes", response_model=List[Quiz])
-async def get_quizzes():
-    return list(quizzes_db.values())
+# Endpoint to replace the contents of a quiz
+@router.put("/update_quiz/{quiz_id}")
+async def update_quiz(quiz_id: int, quiz: Quiz, db: AsyncSession = Depends(get_async_db)):
+    db_quiz = await load_quiz(db, quiz_id)
+    read_version = db_quiz.version
+
+    # Claim the next version only if no other edit has since the quiz was read. The row stays
+    # locked until commit, so a concurrent edit of the same version matches nothing and gets a 409.
+    claimed = await db.execute(
+        update(models.Quiz)
+        .where(models.Quiz.id == quiz_id, models.Quiz.version == read_version)
+        .values(title=quiz.title, description=quiz.description, course_id=quiz.course_id, version=read_version + 1)
+    )
+    if claimed.rowcount == 0:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Quiz was changed by another request; reload it and retry")
 
-# Endpoint to get a specific quiz by ID
-@router.get("/get_quiz/{quiz_id}", response_model=Quiz)
-async def get_quiz(quiz_id: int):
-    quiz = quizzes_db.get(quiz_id)
-    if not quiz:
+    # Old questions are deleted before the new ones are inserted, as they share (quiz_id, position)
+    db_quiz.questions.clear()
+    await db.flush()
+    db_quiz.questions = build_questions(quiz)
+    # A new version changes the quiz ETag and retires its compiled answer key and payload
+    answer_key_cache.delete(f"{quiz_id}:{read_version}")
+    quiz_payload_cache.delete(f"{quiz_id}:{read_version}")
+    await db.commit()
+    return {"quiz_id": quiz_id, "message": "Quiz updated successfully."}
+
+# Endpoint to get a summary list of quizzes (id, title, question count)
+@router.get("/get_quizzes")
+async def get_quizzes(request: Request, db: AsyncSession = Depends(get_async_db)):
+    # The listing changes whenever any quiz does, so derive its ETag from the quiz versions
+    versions = (await db.execute(select(models.Quiz.id, models.Quiz.version).order_by(models.Quiz.id))).all()
+    etag = make_etag([list(row) for row in versions])
+    response = not_modified(request, etag, QUIZ_CACHE_CONTROL)
+    if response is not None:
+        return response
+    body = quiz_payload_cache.get(f"list:{etag}")
+    if body is None:
+        rows = await db.execute(
+            select(models.Quiz.id, models.Quiz.title, func.count(models.Question.id).label("question_count"))
+            .outerjoin(models.Question, models.Question.quiz_id == models.Quiz.id)
+            .group_by(models.Quiz.id)
+            .order_by(models.Quiz.id)
+        )
+        body = quiz_summaries.dump_json(quiz_summaries.validate_python(rows.mappings().all()))
+        quiz_payload_cache.set(f"list:{etag}", body)
+    return encoded_response(request, body, etag, QUIZ_CACHE_CONTROL)
+
+# Endpoint to get a specific quiz by ID, as a student sees it
+@router.get("/get_quiz/{quiz_id}")
+async def get_quiz(quiz_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Check the version first so a revalidation or cache hit never loads the questions
+    version = await db.scalar(select(models.Quiz.version).where(models.Quiz.id == quiz_id))
+    if version is None:
         raise HTTPException(status_code=404, detail="Quiz not found")
-    return quiz
+    etag = quiz_etag(quiz_id, version)
+    response = not_modified(request, etag, QUIZ_CACHE_CONTROL)
+    if response is not None:
+        return response
+    body = quiz_payload_cache.get(f"{quiz_id}:{version}")
+    if body is None:
+        quiz = await load_quiz(db, quiz_id)
+        body = student_view(quiz)
+        # Keyed by the version read above, so a concurrent edit can only leave an unreachable entry
+        quiz_payload_cache.set(f"{quiz_id}:{version}", body)
+    return encoded_response(request, body, etag, QUIZ_CACHE_CONTROL)
 
 # Endpoint to submit a quiz and get a score
 @router.post("/submit_quiz/{quiz_id}", status_code=status.HTTP_200_OK)
-async def submit_quiz(quiz_id: int, submission: QuizSubmission):
-    quiz = quizzes_db.get(quiz_id)
-    if not quiz:
+async def submit_quiz(
+    quiz_id: int,
+    submission: QuizSubmission,
+    user: UserModel = Depends(get_current_db_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    answer_key = (await get_answer_keys(db, [quiz_id])).get(quiz_id)
+    if answer_key is None:
         raise HTTPException(status_code=404, detail="Quiz not found")
 
     # Check if the submitted answers are correct
-    score = 0
-    for answer in submission.answers:
-        if answer.question_id < len(quiz.questions):
-            correct_answer = quiz.questions[answer.question_id].correct_answer
-            if answer.selected_answer == correct_answer:
-                score += 1
-    
-    # Store the user's score for the quiz
-    user_id = 1  # In real implementation, get the user ID from authentication
-    if user_id not in user_scores_db:
-        user_scores_db[user_id] = {}
-
-    user_scores_db[user_id][quiz_id] = score
-
-    return {"score": score, "message": "Quiz submitted successfully."}
\ No newline at end of file
+    score, correct = grade(answer_key, submission.answers)
+
+    # Store the signed-in user's score for the quiz, replacing any earlier attempt
+    await record_score(user.id, quiz_id, score)
+
+    return {"score": score, "correct": correct, "message": "Quiz submitted successfully."}
+
+# Endpoint to get a quiz's score statistics and leaderboard
+@router.get("/quiz_stats/{quiz_id}")
+async def get_quiz_stats(
+    quiz_id: int,
+    top: int = Query(DEFAULT_LEADERBOARD_SIZE, ge=0, le=MAX_LEADERBOARD_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Totals and buckets are kept up to date on every score flush, and the leaderboard is
+    # read off ix_quiz_scores_leaderboard, so no query here scans the quiz's scores
+    stats = await db.get(models.QuizStats, quiz_id)
+    if stats is None:
+        if await db.scalar(select(models.Quiz.id).where(models.Quiz.id == quiz_id)) is None:
+            raise HTTPException(status_code=404, detail="Quiz not found")
+        submissions, total_score = 0, 0
+    else:
+        submissions, total_score = stats.submissions, stats.total_score
+    buckets = await db.execute(
+        select(models.QuizScoreBucket.score, models.QuizScoreBucket.count)
+        .where(models.QuizScoreBucket.quiz_id == quiz_id, models.QuizScoreBucket.count > 0)
+        .order_by(models.QuizScoreBucket.score)
+    )
+    leaders = await db.execute(
+        select(models.QuizScore.user_id, models.QuizScore.score)
+        .where(models.QuizScore.quiz_id == quiz_id)
+        .order_by(models.QuizScore.score.desc(), models.QuizScore.submitted_at)
+        .limit(top)
+    )
+    return {
+        "quiz_id": quiz_id,
+        "submissions": submissions,
+        "mean_score": total_score / submissions if submissions else None,
+        "histogram": {str(score): count for score, count in buckets},
+        "leaderboard": [{"user_id": user_id, "score": score} for user_id, score in leaders],
+    }
+
+# Submissions on behalf of other users (and so onto the leaderboards) are for graders only
+require_grader = require_role("instructor")
+
+# Endpoint to grade many submissions at once (e.g. an exam session's uploads)
+@router.post("/submit_quizzes", status_code=status.HTTP_200_OK, dependencies=[Depends(require_grader)])
+async def submit_quizzes(bulk: BulkQuizSubmission, db: AsyncSession = Depends(get_async_db)):
+    answer_keys = await get_answer_keys(db, {submission.quiz_id for submission in bulk.submissions})
+    results = []
+    for submission in bulk.submissions:
+        answer_key = answer_keys.get(submission.quiz_id)
+        if answer_key is None:
+            results.append({"user_id": submission.user_id, "quiz_id": submission.quiz_id, "error": "Quiz not found"})
+            continue
+        score, correct = grade(answer_key, submission.answers)
+        await record_score(submission.user_id, submission.quiz_id, score)
+        results.append({"user_id": submission.user_id, "quiz_id": submission.quiz_id, "score": score, "correct": correct})
+    return {"results": results}
@@ -1,9 +1,31 @@
 # Backend/app/routers/upload.py
 
-# import os
-from fastapi import APIRouter, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import tempfile
+import time
+import uuid
+from typing import BinaryIO, List, Optional
+from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse
 from pathlib import Path
+from pydantic import BaseModel
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import metrics
+from app.db import conflict_insert, get_async_db
+from app.jobs import enqueue_job, get_job, job_handler, job_to_dict
+from app.models.material import Blob, Material
 
 # Create an instance of the APIRouter
 router = APIRouter()
@@ -12,36 +34,609 @@ router = APIRouter()
 UPLOAD_FOLDER = Path().resolve().parent.parent / 'uploads/courses'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'mp4', 'avi', 'mov'}
 
-# Create the upload folder if it doesn't exist
-if not UPLOAD_FOLDER.exists():
-    UPLOAD_FOLDER.mkdir(parents=True)
+# Uploads are copied in fixed-size chunks and capped at MAX_UPLOAD_SIZE bytes
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(5 * 1024 ** 3)))
+# Room allowed around the file in a multipart body (boundaries, part headers, small fields)
+MULTIPART_OVERHEAD = 64 * 1024
+
+# File contents are stored once per SHA-256 under UPLOAD_FOLDER/.blobs/ab/cd/<sha256>;
+# the materials table maps each uploaded filename to its blob
+# Post-upload processing runs on the background job queue (see app/jobs.py)
+IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+VIDEO_EXTENSIONS = {'mp4', 'avi', 'mov'}
+THUMBNAIL_SIZE = (320, 180)
+# Optional transcode hook, e.g. "ffmpeg -i {input} -vf scale=-2:720 {output}"; runs only when set
+TRANSCODE_COMMAND = os.getenv("TRANSCODE_COMMAND")
+
+# Resumable upload sessions keep their parts under UPLOAD_FOLDER/.sessions/<upload_id>/
+DEFAULT_PART_SIZE = int(os.getenv("UPLOAD_PART_SIZE", str(8 * 1024 * 1024)))
+MAX_PART_SIZE = int(os.getenv("MAX_UPLOAD_PART_SIZE", str(64 * 1024 * 1024)))
+MAX_PARTS = 10000
+UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", str(24 * 3600)))  # Seconds of inactivity
+UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# Create the upload folder if it doesn't exist. Called from the app's lifespan rather than
+# at import, so importing this module has no filesystem side effects.
+def ensure_upload_folder():
+    UPLOAD_FOLDER.mkdir(parents=True, exist_ok=True)
+
+class UploadTooLarge(Exception):
+    """Raised when an upload grows past MAX_UPLOAD_SIZE while it is being copied."""
+
+# Request body for starting a resumable upload
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: Optional[int] = None  # Expected total size in bytes, if known
+    part_size: Optional[int] = None  # Size of every part except the last
+
+class ConcatenatedParts:
+    """Read-only file-like object that reads a list of part files back to back."""
+
+    def __init__(self, paths: List[Path]):
+        self._paths = list(paths)
+        self._current: Optional[BinaryIO] = None
+
+    def read(self, size: int = -1) -> bytes:
+        while True:
+            if self._current is None:
+                if not self._paths:
+                    return b""
+                self._current = open(self._paths.pop(0), "rb")
+            chunk = self._current.read(size)
+            if chunk:
+                return chunk
+            self._current.close()
+            self._current = None
+
+    def close(self):
+        if self._current is not None:
+            self._current.close()
+            self._current = None
 
 def allowed_file(filename: str) -> bool:
     """Check if the uploaded file has an allowed extension."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-@router.post("/upload_course_material")
-async def upload_course_material(file: UploadFile = File(...)):
-    """Handle file uploads for course materials (e.g., videos, images, PDFs)."""
-    if not allowed_file(file.filename):
+def blobs_folder() -> Path:
+    return UPLOAD_FOLDER / ".blobs"
+
+def blob_path(sha256: str) -> Path:
+    """Location of a blob, sharded on the first two bytes of its hash."""
+    return blobs_folder() / sha256[:2] / sha256[2:4] / sha256
+
+class BlobWriter:
+    """Temporary file in the blob store that hashes what is written to it.
+
+    finish() returns the staged blob for register_material, which moves temp_path to the
+    blob's content address if the blob is new and removes it otherwise; discard() removes
+    it straight away. write() raises UploadTooLarge past max_size. Blocking.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self._checksum = hashlib.sha256()
+        blobs_folder().mkdir(parents=True, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(dir=blobs_folder(), prefix=".upload-", suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise UploadTooLarge()
+        self._checksum.update(chunk)
+        self._file.write(chunk)
+
+    def finish(self) -> dict:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        return {"size": self.size, "sha256": self._checksum.hexdigest(), "temp_path": self.temp_path}
+
+    def discard(self):
+        self._file.close()
+        discard_file(self.temp_path)
+
+def store_blob(source: BinaryIO, max_size: int) -> dict:
+    """Copy source into the blob store chunk by chunk (see BlobWriter). Blocking; call it from a worker thread."""
+    writer = BlobWriter(max_size)
+    try:
+        while True:
+            chunk = source.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                return writer.finish()
+            writer.write(chunk)
+    except BaseException:
+        writer.discard()
+        raise
+
+def place_blob(temp_path: str, sha256: str):
+    """Move a fully written temporary file to its content address. Blocking."""
+    destination = blob_path(sha256)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(temp_path, destination)
+
+def discard_file(path) -> None:
+    if os.path.exists(path):
+        os.unlink(path)
+
+async def get_material(db: AsyncSession, filename: str) -> Optional[Material]:
+    result = await db.execute(select(Material).where(Material.filename == filename))
+    return result.scalar_one_or_none()
+
+async def register_material(db: AsyncSession, filename: str, staged: dict) -> dict:
+    """Map filename to its blob and take a reference on the blob, in one transaction.
+
+    Whether the content is new is decided by the blob row, not by what is on disk: the
+    upsert locks the row until commit, and only the transaction that created it moves
+    its file into place, before committing. release_material unlinks under the same
+    lock, so a concurrent upload and delete of the same content cannot lose the file.
+    """
+    sha256 = staged["sha256"]
+    upsert = conflict_insert(db, Blob).values(sha256=sha256, size=staged["size"], ref_count=1)
+    placed = False
+    try:
+        ref_count = await db.scalar(upsert.on_conflict_do_update(
+            index_elements=[Blob.sha256], set_={"ref_count": Blob.ref_count + 1},
+        ).returning(Blob.ref_count))
+        deduplicated = ref_count > 1
+        db.add(Material(filename=filename, sha256=sha256))
+        # The unique index on materials.filename rejects a second file with the same name
+        await db.flush()
+        if not deduplicated:
+            await run_in_threadpool(place_blob, staged["temp_path"], sha256)
+            placed = True
+        await db.commit()
+    except BaseException as e:
+        await db.rollback()
+        if placed and await db.get(Blob, sha256) is None:
+            # Nothing references the file this transaction put in place
+            await run_in_threadpool(discard_file, blob_path(sha256))
+        if isinstance(e, IntegrityError):
+            raise HTTPException(status_code=400, detail="File already exists")
+        raise
+    finally:
+        await run_in_threadpool(discard_file, staged["temp_path"])
+    metrics.inc("uploads_total", deduplicated=str(deduplicated).lower())
+    return {"size": staged["size"], "sha256": sha256, "deduplicated": deduplicated}
+
+async def release_material(db: AsyncSession, material: Material):
+    """Drop a filename mapping and its blob reference, deleting the blob when unused.
+
+    The file is set aside while the blob row's deletion is still uncommitted (and the row
+    locked), so an upload of the same content waits and then stores a fresh copy; it is
+    only unlinked once the deletion commits, and put back if the commit fails.
+    """
+    sha256 = material.sha256
+    await db.delete(material)
+    await db.execute(update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count - 1))
+    unused = await db.execute(delete(Blob).where(Blob.sha256 == sha256, Blob.ref_count <= 0))
+    path = blob_path(sha256)
+    set_aside = path.with_name(f".{sha256}.deleted-{uuid.uuid4().hex}")
+    if unused.rowcount and path.exists():
+        await run_in_threadpool(os.replace, path, set_aside)
+    try:
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        if set_aside.exists():
+            await run_in_threadpool(os.replace, set_aside, path)
+        raise
+    await run_in_threadpool(discard_file, set_aside)
+
+def extension(filename: str) -> str:
+    return filename.rsplit('.', 1)[-1].lower()
+
+async def enqueue_media_jobs(db: AsyncSession, filename: str, stored: dict) -> List[int]:
+    """Queue post-upload processing for a newly stored blob; deduplicated blobs were already processed."""
+    if stored["deduplicated"]:
+        return []
+    payload = {"sha256": stored["sha256"], "filename": filename}
+    job_types = ["media_metadata"]
+    if extension(filename) in IMAGE_EXTENSIONS:
+        job_types.append("thumbnail")
+    if extension(filename) in VIDEO_EXTENSIONS and TRANSCODE_COMMAND:
+        job_types.append("transcode")
+    return [await enqueue_job(db, job_type, payload) for job_type in job_types]
+
+@job_handler("media_metadata", concurrency=4)
+def extract_media_metadata(payload: dict) -> dict:
+    """Record size and type of an upload, plus image dimensions (Pillow) or video streams (ffprobe) when available."""
+    path = blob_path(payload["sha256"])
+    metadata = {"size": path.stat().st_size, "content_type": mimetypes.guess_type(payload["filename"])[0]}
+    if extension(payload["filename"]) in IMAGE_EXTENSIONS:
+        try:
+            from PIL import Image
+        except ImportError:
+            return metadata
+        with Image.open(path) as image:
+            metadata.update(width=image.width, height=image.height)
+    elif extension(payload["filename"]) in VIDEO_EXTENSIONS and shutil.which("ffprobe"):
+        probe = subprocess.run(
+            ["ffprobe", "-v", "error", "-print_format", "json", "-show_format", "-show_streams", str(path)],
+            capture_output=True, check=True, text=True, timeout=300,
+        )
+        info = json.loads(probe.stdout)
+        metadata["duration"] = float(info.get("format", {}).get("duration", 0))
+        metadata["streams"] = [
+            {key: stream.get(key) for key in ("codec_type", "codec_name", "width", "height")}
+            for stream in info.get("streams", [])
+        ]
+    return metadata
+
+@job_handler("thumbnail", concurrency=2)
+def make_thumbnail(payload: dict) -> dict:
+    """Write a JPEG thumbnail of an uploaded image to UPLOAD_FOLDER/.thumbnails (requires Pillow)."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return {"skipped": "Pillow is not installed"}
+    destination = UPLOAD_FOLDER / ".thumbnails" / f"{payload['sha256']}.jpg"
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    with Image.open(blob_path(payload["sha256"])) as image:
+        image.thumbnail(THUMBNAIL_SIZE)
+        image.convert("RGB").save(destination, "JPEG")
+    return {"thumbnail": str(destination)}
+
+@job_handler("transcode", concurrency=1, max_attempts=2)
+def transcode_video(payload: dict) -> dict:
+    """Run TRANSCODE_COMMAND on an uploaded video, writing to UPLOAD_FOLDER/.transcoded."""
+    destination = UPLOAD_FOLDER / ".transcoded" / f"{payload['sha256']}.mp4"
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    command = [
+        part.format(input=blob_path(payload["sha256"]), output=destination)
+        for part in shlex.split(TRANSCODE_COMMAND)
+    ]
+    subprocess.run(command, capture_output=True, check=True)
+    return {"output": str(destination)}
+
+def sessions_folder() -> Path:
+    return UPLOAD_FOLDER / ".sessions"
+
+def session_path(upload_id: str) -> Path:
+    """Directory of an upload session; 404s for unknown or malformed ids."""
+    path = sessions_folder() / upload_id
+    if not UPLOAD_ID_PATTERN.match(upload_id) or not path.is_dir():
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return path
+
+def part_path(session: Path, part_number: int) -> Path:
+    return session / f"part-{part_number:05d}"
+
+def load_session(session: Path) -> dict:
+    return json.loads((session / "session.json").read_text())
+
+def list_parts(session: Path) -> dict:
+    """Map of part number -> size in bytes for the parts received so far."""
+    return {int(path.name[5:]): path.stat().st_size for path in session.glob("part-*")}
+
+def received_ranges(parts: dict, part_size: int) -> List[List[int]]:
+    """Merge received parts into inclusive [start, end] byte ranges of the final file."""
+    ranges = []
+    for number in sorted(parts):
+        start = (number - 1) * part_size
+        end = start + parts[number] - 1
+        if ranges and ranges[-1][1] + 1 == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    return ranges
+
+def cleanup_stale_sessions(max_age: int = UPLOAD_SESSION_TTL) -> int:
+    """Remove upload sessions with no activity for max_age seconds. Blocking."""
+    folder = sessions_folder()
+    if not folder.exists():
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for session in folder.iterdir():
+        if session.is_dir() and session.stat().st_mtime < cutoff:
+            shutil.rmtree(session, ignore_errors=True)
+            removed += 1
+    return removed
+
+def declared_length(request: Request) -> Optional[int]:
+    """The request's Content-Length, if it sent a valid one."""
+    try:
+        return int(request.headers["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+async def write_part(request: Request, destination: Path, max_size: int) -> int:
+    """Stream the request body into destination, buffering up to UPLOAD_CHUNK_SIZE per disk write."""
+    # A body announced as too large is refused before any of it is read
+    if (declared_length(request) or 0) > max_size:
+        raise UploadTooLarge()
+    fd, temp_name = tempfile.mkstemp(dir=destination.parent, prefix=".upload-", suffix=".part")
+    temp_file = os.fdopen(fd, "wb")
+    buffer = bytearray()
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLarge()
+            buffer += chunk
+            if len(buffer) >= UPLOAD_CHUNK_SIZE:
+                await run_in_threadpool(temp_file.write, buffer)
+                buffer.clear()
+        if buffer:
+            await run_in_threadpool(temp_file.write, buffer)
+        await run_in_threadpool(temp_file.close)
+        # Re-sending a part replaces the earlier copy, so retries are idempotent
+        os.replace(temp_name, destination)
+    except BaseException:
+        temp_file.close()
+        os.unlink(temp_name)
+        raise
+    return size
+
+class MultipartFile:
+    """Reads one file field out of a multipart/form-data request body as it arrives.
+
+    The body is fed through python-multipart's incremental parser, so the file is never
+    spooled to memory or disk before it reaches the blob store: read_filename() reads up
+    to the field's headers, then store() streams the rest of its data into a BlobWriter,
+    buffering up to UPLOAD_CHUNK_SIZE per disk write. Other fields are skipped.
+    """
+
+    def __init__(self, request: Request, field: str):
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or not params.get(b"boundary"):
+            raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+        self.field = field.encode()
+        self.filename: Optional[str] = None
+        self.complete = False
+        self._chunks = request.stream().__aiter__()
+        self._data = bytearray()
+        self._in_file = False
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._disposition = b""
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": lambda data, start, end: self._header_field.extend(data[start:end]),
+            "on_header_value": lambda data, start, end: self._header_value.extend(data[start:end]),
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._disposition = b""
+
+    def _on_header_end(self):
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = bytes(self._header_value)
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if self.filename is None and options.get(b"name") == self.field and b"filename" in options:
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            self._in_file = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self._data += data[start:end]
+
+    def _on_part_end(self):
+        if self._in_file:
+            self._in_file = False
+            self.complete = True
+
+    async def _feed(self) -> bool:
+        """Parse the next chunk of the body; False once the body has ended."""
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return False
+        try:
+            self._parser.write(chunk)
+        except FormParserError:
+            raise HTTPException(status_code=400, detail="Malformed multipart body")
+        return True
+
+    async def read_filename(self) -> str:
+        while self.filename is None:
+            if not await self._feed():
+                raise HTTPException(status_code=400, detail=f"No {self.field.decode()} was uploaded")
+        return self.filename
+
+    async def store(self, max_size: int) -> dict:
+        """Stream the file's data into the blob store; returns the staged blob (see BlobWriter)."""
+        writer = await run_in_threadpool(BlobWriter, max_size)
+        try:
+            while True:
+                if len(self._data) > max_size - writer.size:
+                    raise UploadTooLarge()
+                if len(self._data) >= UPLOAD_CHUNK_SIZE or (self.complete and self._data):
+                    await run_in_threadpool(writer.write, bytes(self._data))
+                    self._data.clear()
+                if self.complete:
+                    return await run_in_threadpool(writer.finish)
+                if not await self._feed():
+                    raise HTTPException(status_code=400, detail="Upload ended before the file did")
+        except BaseException:
+            await run_in_threadpool(writer.discard)
+            raise
+
+# The form is parsed by MultipartFile rather than FastAPI, so its schema is declared here
+UPLOAD_FORM_SCHEMA = {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+    "type": "object", "properties": {"file": {"type": "string", "format": "binary"}}, "required": ["file"],
+}}}}}
+
+@router.post("/upload_course_material", openapi_extra=UPLOAD_FORM_SCHEMA)
+async def upload_course_material(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Handle file uploads for course materials (e.g., videos, images, PDFs).
+
+    Takes a multipart form with the file in its "file" field, streamed into the blob store
+    as it arrives; a body announced as larger than the limit is refused without reading it.
+    """
+    if (declared_length(request) or 0) > MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {MAX_UPLOAD_SIZE} byte upload limit")
+    file = MultipartFile(request, "file")
+    uploaded_name = await file.read_filename()
+    if not allowed_file(uploaded_name):
         raise HTTPException(
             status_code=400,
             detail="File type not allowed. Allowed types: png, jpg, jpeg, gif, pdf, mp4, avi, mov."
         )
 
-    # Secure the filename by removing any special characters
-    filename = file.filename
-
-    # Save the file
-    file_path = UPLOAD_FOLDER / filename
+    # Secure the filename by dropping any directory components
+    filename = Path(uploaded_name).name
 
     # Check if file already exists (you can also choose to overwrite or rename it)
-    if file_path.exists():
+    if await get_material(db, filename):
         raise HTTPException(status_code=400, detail="File already exists")
 
-    # Save the uploaded file
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    # Stream the rest of the file into the blob store, writing off the event loop
+    try:
+        staged = await file.store(MAX_UPLOAD_SIZE)
+        metrics.inc("upload_bytes_total", staged["size"], kind="direct")
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {MAX_UPLOAD_SIZE} byte upload limit")
+    stored = await register_material(db, filename, staged)
+    job_ids = await enqueue_media_jobs(db, filename, stored)
+
+    return JSONResponse(
+        content={"message": f"File {filename} uploaded successfully", "filename": filename, "jobs": job_ids, **stored},
+        status_code=200,
+    )
+
+# Endpoint to download or stream an uploaded file
+@router.api_route("/files/{filename}", methods=["GET", "HEAD"])
+async def stream_course_material(filename: str, db: AsyncSession = Depends(get_async_db)):
+    """Serve an uploaded file, honouring Range and If-Range so video players can seek.
+
+    FileResponse sends the file with the server's zero-copy pathsend extension when it
+    offers one and otherwise streams it in chunks through async reads; either way the
+    file is never loaded into memory. Content-Type is guessed from the extension and
+    the ETag is the content hash.
+    """
+    material = await get_material(db, filename)
+    if material is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return FileResponse(
+        blob_path(material.sha256),
+        media_type=mimetypes.guess_type(filename)[0],
+        headers={"etag": f'"{material.sha256}"'},
+    )
+
+# Endpoint to delete an uploaded file
+@router.delete("/files/{filename}")
+async def delete_course_material(filename: str, db: AsyncSession = Depends(get_async_db)):
+    material = await get_material(db, filename)
+    if material is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    await release_material(db, material)
+    return {"message": f"File {filename} deleted"}
+
+# Endpoint to poll the status of a post-upload processing job
+@router.get("/jobs/{job_id}")
+async def get_upload_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    job = await get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(job)
+
+# Endpoint to start a resumable upload
+@router.post("/sessions", status_code=201)
+async def create_upload_session(details: UploadSessionCreate, db: AsyncSession = Depends(get_async_db)):
+    """Start a resumable upload; parts are then sent with PUT /sessions/{upload_id}/parts/{n}."""
+    if not allowed_file(details.filename):
+        raise HTTPException(
+            status_code=400,
+            detail="File type not allowed. Allowed types: png, jpg, jpeg, gif, pdf, mp4, avi, mov."
+        )
+    filename = Path(details.filename).name
+    if await get_material(db, filename):
+        raise HTTPException(status_code=400, detail="File already exists")
+    if details.size is not None and details.size > MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {MAX_UPLOAD_SIZE} byte upload limit")
+    part_size = details.part_size or DEFAULT_PART_SIZE
+    if not 0 < part_size <= MAX_PART_SIZE:
+        raise HTTPException(status_code=400, detail=f"part_size must be between 1 and {MAX_PART_SIZE} bytes")
+
+    await run_in_threadpool(cleanup_stale_sessions)
+    upload_id = uuid.uuid4().hex
+    session = sessions_folder() / upload_id
+    session.mkdir(parents=True)
+    metadata = {"filename": filename, "size": details.size, "part_size": part_size, "created_at": time.time()}
+    (session / "session.json").write_text(json.dumps(metadata))
+    return {"upload_id": upload_id, "part_size": part_size, "max_parts": MAX_PARTS}
+
+# Endpoint to upload one part of a resumable upload (raw bytes in the request body)
+@router.put("/sessions/{upload_id}/parts/{part_number}")
+async def upload_part(upload_id: str, part_number: int, request: Request):
+    session = session_path(upload_id)
+    if not 1 <= part_number <= MAX_PARTS:
+        raise HTTPException(status_code=400, detail=f"part_number must be between 1 and {MAX_PARTS}")
+    metadata = load_session(session)
+    part_size = metadata["part_size"]
+    # No part may reach past the declared size (or MAX_UPLOAD_SIZE), so a session can never
+    # hold more on disk than the file it is meant to become
+    limit = min(MAX_UPLOAD_SIZE, metadata["size"] if metadata["size"] is not None else MAX_UPLOAD_SIZE)
+    start = (part_number - 1) * part_size
+    if start > limit:
+        raise HTTPException(status_code=413, detail=f"Part {part_number} starts beyond the {limit} byte upload size")
+    max_size = min(part_size, limit - start)
+    try:
+        size = await write_part(request, part_path(session, part_number), max_size)
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail=f"Part {part_number} may not exceed {max_size} bytes")
+    metrics.inc("upload_bytes_total", size, kind="part")
+    return {"part_number": part_number, "size": size}
+
+# Endpoint to see which parts and byte ranges of a resumable upload have arrived
+@router.get("/sessions/{upload_id}")
+async def get_upload_session(upload_id: str):
+    session = session_path(upload_id)
+    metadata = load_session(session)
+    parts = list_parts(session)
+    return {
+        "upload_id": upload_id,
+        "filename": metadata["filename"],
+        "size": metadata["size"],
+        "part_size": metadata["part_size"],
+        "parts": [{"part_number": number, "size": parts[number]} for number in sorted(parts)],
+        "received_bytes": sum(parts.values()),
+        "received_ranges": received_ranges(parts, metadata["part_size"]),
+    }
+
+# Endpoint to assemble the parts of a resumable upload into the final file
+@router.post("/sessions/{upload_id}/complete")
+async def complete_upload_session(upload_id: str, db: AsyncSession = Depends(get_async_db)):
+    session = session_path(upload_id)
+    metadata = load_session(session)
+    parts = list_parts(session)
+    numbers = sorted(parts)
+    if not numbers or numbers != list(range(1, len(numbers) + 1)):
+        raise HTTPException(status_code=400, detail="Parts are missing from the upload")
+    if any(parts[number] != metadata["part_size"] for number in numbers[:-1]):
+        raise HTTPException(status_code=400, detail="Only the last part may be smaller than part_size")
+    if metadata["size"] is not None and sum(parts.values()) != metadata["size"]:
+        raise HTTPException(status_code=400, detail="Uploaded size does not match the declared size")
+
+    filename = metadata["filename"]
+    source = ConcatenatedParts([part_path(session, number) for number in numbers])
+    try:
+        staged = await run_in_threadpool(store_blob, source, MAX_UPLOAD_SIZE)
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {MAX_UPLOAD_SIZE} byte upload limit")
+    finally:
+        source.close()
+    stored = await register_material(db, filename, staged)
+    job_ids = await enqueue_media_jobs(db, filename, stored)
+    await run_in_threadpool(shutil.rmtree, session, True)
+    return {"message": f"File {filename} uploaded successfully", "filename": filename, "jobs": job_ids, **stored}
 
-    return JSONResponse(content={"message": f"File uploaded successfully to {file_path}"}, status_code=200)
\ No newline at end of file
+# Endpoint to abandon a resumable upload and delete its parts
+@router.delete("/sessions/{upload_id}")
+async def abort_upload_session(upload_id: str):
+    session = session_path(upload_id)
+    await run_in_threadpool(shutil.rmtree, session, True)
+    return {"message": "Upload session aborted"}
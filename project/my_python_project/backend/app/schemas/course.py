@@ -1,6 +1,6 @@
 # Backend/app/schemas/course.py
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 
 # Pydantic model for course content (e.g., lessons, videos)
@@ -30,6 +30,36 @@ class CourseUpdate(BaseModel):
     description: Optional[str]  # Description of the course (optional for update)
     content: Optional[List[CourseContentBase]]  # List of content (optional for update)
 
+# Pydantic model for the columns stored on a course row
+class CourseDetails(BaseModel):
+    title: str  # Title of the course
+    description: str  # Description of the course
+    price: int = 0  # Price of the course
+    video_url: Optional[str] = None  # URL or path of the course video
+
+# Pydantic model for partially updating a course row
+class CourseDetailsUpdate(BaseModel):
+    title: Optional[str] = None  # Title of the course (optional for update)
+    description: Optional[str] = None  # Description of the course (optional for update)
+    price: Optional[int] = None  # Price of the course (optional for update)
+    video_url: Optional[str] = None  # Video URL of the course (optional for update)
+
+# Pydantic model for a course row as returned by the API, read straight off the ORM object.
+# Fields other than id are optional because listings can project a subset with ?fields=.
+class CourseRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int  # ID of the course in the database
+    title: Optional[str] = None  # Title of the course
+    description: Optional[str] = None  # Description of the course
+    price: Optional[int] = None  # Price of the course
+    video_url: Optional[str] = None  # URL or path of the course video
+
+# Pydantic model for one page of the course listing
+class CoursePage(BaseModel):
+    items: List[CourseRead]  # Courses on this page
+    next_cursor: Optional[str] = None  # Token for the next page, or None on the last page
+
 # Pydantic model for student enrollment in a course
 class Enrollment(BaseModel):
     course_id: int  # ID of the course to enroll in
@@ -1,6 +1,6 @@
 # Backend/app/schemas/quiz.py
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import List, Optional
 
 # Pydantic model for a question in a quiz
@@ -36,4 +36,32 @@ class QuizSubmission(BaseModel):
 class QuizScore(BaseModel):
     quiz_id: int  # ID of the quiz
     user_id: int  # ID of the user who took the quiz
-    score: int  # The score the user achieved on the quiz
\ No newline at end of file
+    score: int  # The score the user achieved on the quiz
+
+# Pydantic model for a question as a student sees it (no correct answer), read off the ORM row
+class StudentQuestion(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    question_id: int = Field(validation_alias="position")  # Position of the question; what answers refer to
+    question_text: str  # The question text
+    options: List[str]  # Option texts in order
+
+    @field_validator("options", mode="before")
+    @classmethod
+    def option_texts(cls, options):
+        return [getattr(option, "text", option) for option in options]
+
+# Pydantic model for a quiz as a student sees it while taking it
+class StudentQuiz(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int  # ID of the quiz
+    title: str  # Title of the quiz
+    description: Optional[str]  # Description of the quiz
+    questions: List[StudentQuestion]  # Questions in order, without answers
+
+# Pydantic model for an entry in the quiz listing
+class QuizSummary(BaseModel):
+    id: int  # ID of the quiz
+    title: str  # Title of the quiz
+    question_count: int  # Number of questions in the quiz
@@ -0,0 +1,121 @@
+# Backend/app/search.py
+
+"""Full-text search over course titles and descriptions.
+
+Each database dialect gets a SearchBackend. On SQLite this is an FTS5 index that
+triggers keep in step with the courses table, so every write path updates the index
+incrementally: the API, bulk seeding, and manual SQL. Dialects without a registered
+backend fall back to a LIKE scan, which is correct but does not scale. To plug in
+another engine, register a backend for its dialect in SEARCH_BACKENDS.
+"""
+
+import re
+from typing import List, Tuple
+from sqlalchemy import case, event, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import Base
+from app.models.course import Course
+
+# Words in a query; punctuation and FTS operators typed by users are ignored
+TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def query_terms(query: str) -> List[str]:
+    return [term.lower() for term in TERM_PATTERN.findall(query)]
+
+class SearchBackend:
+    """Interface for course search indexes."""
+
+    def create(self, connection) -> None:
+        """Create the index (and whatever keeps it current) if missing; runs after create_all."""
+
+    async def search(self, db: AsyncSession, terms: List[str], limit: int, offset: int) -> List[Tuple[int, float]]:
+        """(course_id, score) pairs for courses matching every term as a prefix, best first."""
+        raise NotImplementedError
+
+class Fts5SearchBackend(SearchBackend):
+    """SQLite FTS5 index over courses, ranked by BM25 with title matches weighted higher."""
+
+    table = "course_search"
+    title_weight = 10.0
+    description_weight = 1.0
+
+    def create(self, connection) -> None:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": self.table},
+        ).first()
+        if exists:
+            return
+        # External content: the index stores only tokens and reads the text back from courses.
+        # prefix='2 3' keeps short prefix lookups (the common search-as-you-type case) indexed.
+        statements = [
+            f"""CREATE VIRTUAL TABLE {self.table} USING fts5(
+                title, description, content='courses', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )""",
+            f"""CREATE TRIGGER courses_search_insert AFTER INSERT ON courses BEGIN
+                INSERT INTO {self.table}(rowid, title, description) VALUES (new.id, new.title, new.description);
+            END""",
+            f"""CREATE TRIGGER courses_search_delete AFTER DELETE ON courses BEGIN
+                INSERT INTO {self.table}({self.table}, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END""",
+            f"""CREATE TRIGGER courses_search_update AFTER UPDATE OF title, description ON courses BEGIN
+                INSERT INTO {self.table}({self.table}, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO {self.table}(rowid, title, description) VALUES (new.id, new.title, new.description);
+            END""",
+            # Index any courses that existed before search did
+            f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')",
+        ]
+        for statement in statements:
+            connection.execute(text(statement))
+
+    async def search(self, db: AsyncSession, terms: List[str], limit: int, offset: int) -> List[Tuple[int, float]]:
+        # Quote each term so it is matched literally, and make it a prefix query
+        match = " ".join(f'"{term}"*' for term in terms)
+        rows = await db.execute(
+            text(
+                f"SELECT rowid, bm25({self.table}, :title_weight, :description_weight) AS score "
+                f"FROM {self.table} WHERE {self.table} MATCH :match "
+                "ORDER BY score, rowid LIMIT :limit OFFSET :offset"
+            ),
+            {
+                "match": match,
+                "title_weight": self.title_weight,
+                "description_weight": self.description_weight,
+                "limit": limit,
+                "offset": offset,
+            },
+        )
+        # bm25() is lower-is-better; flip it so clients see higher-is-better
+        return [(course_id, -score) for course_id, score in rows]
+
+class LikeSearchBackend(SearchBackend):
+    """Unindexed fallback: substring match on every term, title matches first."""
+
+    async def search(self, db: AsyncSession, terms: List[str], limit: int, offset: int) -> List[Tuple[int, float]]:
+        in_title = [Course.title.icontains(term, autoescape=True) for term in terms]
+        in_either = [or_(title, Course.description.icontains(term, autoescape=True)) for term, title in zip(terms, in_title)]
+        score = sum(case((title, 1), else_=0) for title in in_title)
+        rows = await db.execute(
+            select(Course.id, score).where(*in_either).order_by(score.desc(), Course.id).limit(limit).offset(offset)
+        )
+        return [(course_id, float(score)) for course_id, score in rows]
+
+SEARCH_BACKENDS = {"sqlite": Fts5SearchBackend()}
+DEFAULT_SEARCH_BACKEND = LikeSearchBackend()
+
+def search_backend(dialect: str) -> SearchBackend:
+    return SEARCH_BACKENDS.get(dialect, DEFAULT_SEARCH_BACKEND)
+
+async def search_courses(db: AsyncSession, query: str, limit: int, offset: int = 0) -> List[Tuple[int, float]]:
+    """Ranked (course_id, score) matches for a free-text query; empty if it has no words."""
+    terms = query_terms(query)
+    if not terms:
+        return []
+    return await search_backend(db.get_bind().dialect.name).search(db, terms, limit, offset)
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_index(metadata, connection, **kw):
+    if Course.__tablename__ in metadata.tables:
+        search_backend(connection.dialect.name).create(connection)
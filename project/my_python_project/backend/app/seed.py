@@ -1,93 +1,226 @@
-# Backend/app/routers/seed.py
-
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from datetime import datetime
-from random import randint
-
-# Initialize the APIRouter instance
-router = APIRouter()
-
-# Pydantic models for request bodies (same as your course, quiz, or user models)
-class User(BaseModel):
-    username: str
-    email: str
-    hashed_password: str
-
-class Course(BaseModel):
-    title: str
-    description: str
-    instructor: str
-
-class Question(BaseModel):
-    question_text: str
-    options: list
-    correct_answer: int
-
-class Quiz(BaseModel):
-    title: str
-    description: str
-    questions: list
-
-
-# Mock data storage (use a real database in production)
-users_db = {}
-courses_db = {}
-quizzes_db = {}
-
-# Seeding users into the database
-def seed_users():
-    users_db["admin"] = User(username="admin", email="admin@example.com", hashed_password="hashedpassword")
-    users_db["testuser"] = User(username="testuser", email="testuser@example.com", hashed_password="hashedpassword")
-    print("Seeded Users")
-
-# Seeding courses into the database
-def seed_courses():
-    courses_db[1] = Course(
-        title="Python Programming for Beginners",
-        description="Learn the basics of Python programming",
-        instructor="John Doe"
+# Backend/app/seed.py
+
+"""Deterministic bulk seeding for local load testing.
+
+Users, courses, quizzes (with questions and options) and progress rows are generated
+lazily from a random seed and written in chunks with executemany INSERTs, so the number
+of rows in memory at once never exceeds the chunk size. Seeding an empty database twice
+with the same seed and counts produces identical data.
+
+Run it from the backend directory:
+
+    python -m app.seed --users 1000000 --courses 5000 --quizzes 2000 --seed 42
+
+The POST /seed/seed_all endpoint is only mounted when SEED_ENDPOINT=1 (see app/main.py),
+and then only admins may call it: seeded users are instructors and students sharing
+SEED_PASSWORD, so an open endpoint would hand out instructor logins.
+
+Rows get explicit ids following the current maximum of each table. That keeps the
+relations computable without reading anything back, but on PostgreSQL the id sequences
+must be advanced afterwards, so this is meant for local SQLite databases.
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import random
+import time
+from typing import Dict, Iterable, Iterator, List
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import AsyncSessionLocal, get_async_db, init_db
+from app.models.course import Course
+from app.models.quiz import Progress, Question, QuestionOption, Quiz
+from app.models.user import User
+from app.routers.auth import hash_password_async, import_users, require_role
+
+logger = logging.getLogger(__name__)
+
+# Initialize the APIRouter instance; every route on it is for admins only
+router = APIRouter(dependencies=[Depends(require_role("admin"))])
+
+SEED_CHUNK_SIZE = 5000
+SEED_PASSWORD = "password"  # Every seeded user can log in with this
+
+TOPICS = [
+    "Python", "JavaScript", "SQL", "Data Science", "Machine Learning", "Web Development",
+    "Statistics", "Linear Algebra", "Cloud Computing", "Networking", "Security", "Design",
+]
+LEVELS = ["Introduction to", "Foundations of", "Practical", "Advanced", "Mastering"]
+FORMATS = ["video lectures", "hands-on labs", "weekly quizzes", "a capstone project", "reading notes"]
+
+class SeedRequest(BaseModel):
+    users: int = Field(100, ge=0, le=100_000)
+    courses: int = Field(20, ge=0, le=10_000)
+    quizzes: int = Field(10, ge=0, le=10_000)
+    questions_per_quiz: int = Field(5, ge=1, le=50)
+    options_per_question: int = Field(4, ge=2, le=10)
+    progress_per_user: int = Field(3, ge=0, le=100)
+    seed: int = 0
+
+def chunked(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def generate_users(rng: random.Random, first_id: int, count: int, hashed_password: str) -> Iterator[dict]:
+    # Hashing a password per row would take hours at bcrypt cost; all users share one hash
+    for user_id in range(first_id, first_id + count):
+        yield {
+            "id": user_id,
+            "username": f"user{user_id}",
+            "email": f"user{user_id}@example.com",
+            "hashed_password": hashed_password,
+            "role": "instructor" if rng.random() < 0.01 else "student",
+        }
+
+def generate_courses(rng: random.Random, first_id: int, count: int) -> Iterator[dict]:
+    for course_id in range(first_id, first_id + count):
+        topic = rng.choice(TOPICS)
+        yield {
+            "id": course_id,
+            "title": f"{rng.choice(LEVELS)} {topic} {course_id}",
+            "description": f"A {topic} course with {rng.choice(FORMATS)} and {rng.choice(FORMATS)}.",
+            "price": rng.randrange(0, 200),
+            "video_url": f"/upload/files/course-{course_id}.mp4",
+        }
+
+def generate_quizzes(rng: random.Random, first_id: int, count: int, course_ids: range) -> Iterator[dict]:
+    for quiz_id in range(first_id, first_id + count):
+        yield {
+            "id": quiz_id,
+            "course_id": rng.choice(course_ids) if course_ids else None,
+            "title": f"{rng.choice(TOPICS)} Quiz {quiz_id}",
+            "description": "Check your understanding of this unit.",
+            "version": 1,
+        }
+
+def generate_questions(
+    rng: random.Random, first_id: int, quiz_ids: range, per_quiz: int, options: int,
+) -> Iterator[dict]:
+    question_id = first_id
+    for quiz_id in quiz_ids:
+        for position in range(per_quiz):
+            yield {
+                "id": question_id,
+                "quiz_id": quiz_id,
+                "position": position,
+                "question_text": f"Question {position + 1} of quiz {quiz_id}?",
+                "correct_answer": rng.randrange(options),
+            }
+            question_id += 1
+
+def generate_options(first_id: int, question_ids: range, per_question: int) -> Iterator[dict]:
+    option_id = first_id
+    for question_id in question_ids:
+        for position in range(per_question):
+            yield {"id": option_id, "question_id": question_id, "position": position, "text": f"Option {position + 1}"}
+            option_id += 1
+
+def generate_progress(rng: random.Random, user_ids: range, course_ids: range, per_user: int) -> Iterator[dict]:
+    per_user = min(per_user, len(course_ids))
+    for user_id in user_ids:
+        for course_id in rng.sample(course_ids, per_user):
+            yield {"user_id": user_id, "course_id": course_id, "completed": rng.randrange(0, 101)}
+
+async def bulk_insert(db: AsyncSession, model, rows: Iterable[dict], chunk_size: int = SEED_CHUNK_SIZE) -> int:
+    """Insert rows chunk by chunk with executemany; returns the number of rows written."""
+    inserted = 0
+    for chunk in chunked(rows, chunk_size):
+        await db.execute(insert(model.__table__), chunk)
+        inserted += len(chunk)
+    await db.commit()
+    return inserted
+
+async def next_id(db: AsyncSession, model) -> int:
+    return (await db.scalar(select(func.max(model.id))) or 0) + 1
+
+async def seed_database(db: AsyncSession, request: SeedRequest, chunk_size: int = SEED_CHUNK_SIZE) -> Dict[str, float]:
+    """Generate and insert a dataset; returns rows written per table plus timing."""
+    # One RNG per table, so changing one count does not reshuffle the other tables
+    rng = {table: random.Random(f"{request.seed}:{table}") for table in ("users", "courses", "quizzes", "questions", "progress")}
+    start = time.perf_counter()
+    report: Dict[str, float] = {}
+
+    first_user = await next_id(db, User)
+    user_ids = range(first_user, first_user + request.users)
+    # Hashed on the password pool, like sign-ins, so the event loop is not blocked by bcrypt
+    hashed_password = await hash_password_async(SEED_PASSWORD)
+    report["users"] = await import_users(
+        db,
+        generate_users(rng["users"], first_user, request.users, hashed_password),
+        chunk_size=chunk_size,
     )
-    courses_db[2] = Course(
-        title="Advanced JavaScript",
-        description="Deep dive into JavaScript and modern frameworks",
-        instructor="Jane Smith"
+
+    first_course = await next_id(db, Course)
+    course_ids = range(first_course, first_course + request.courses)
+    report["courses"] = await bulk_insert(
+        db, Course, generate_courses(rng["courses"], first_course, request.courses), chunk_size,
     )
-    print("Seeded Courses")
-
-# Seeding quizzes into the database
-def seed_quizzes():
-    quiz_1 = Quiz(
-        title="Python Basics Quiz",
-        description="Test your knowledge of basic Python programming",
-        questions=[
-            Question(question_text="What is 2 + 2?", options=["3", "4", "5"], correct_answer=1),
-            Question(question_text="What does 'print' do in Python?", options=["Prints text", "Adds two numbers", "Divides numbers"], correct_answer=0)
-        ]
+
+    first_quiz = await next_id(db, Quiz)
+    quiz_ids = range(first_quiz, first_quiz + request.quizzes)
+    report["quizzes"] = await bulk_insert(
+        db, Quiz, generate_quizzes(rng["quizzes"], first_quiz, request.quizzes, course_ids), chunk_size,
     )
-    quiz_2 = Quiz(
-        title="JavaScript Basics Quiz",
-        description="Test your knowledge of basic JavaScript programming",
-        questions=[
-            Question(question_text="Which symbol is used for comments in JavaScript?", options=["//", "/*", "#"], correct_answer=0),
-            Question(question_text="What is the result of 10 + '10' in JavaScript?", options=["'1010'", "20", "NaN"], correct_answer=0)
-        ]
+
+    first_question = await next_id(db, Question)
+    question_ids = range(first_question, first_question + request.quizzes * request.questions_per_quiz)
+    report["quiz_questions"] = await bulk_insert(
+        db,
+        Question,
+        generate_questions(
+            rng["questions"], first_question, quiz_ids, request.questions_per_quiz, request.options_per_question,
+        ),
+        chunk_size,
     )
-    quizzes_db[1] = quiz_1
-    quizzes_db[2] = quiz_2
-    print("Seeded Quizzes")
+    report["quiz_options"] = await bulk_insert(
+        db,
+        QuestionOption,
+        generate_options(await next_id(db, QuestionOption), question_ids, request.options_per_question),
+        chunk_size,
+    )
+    report["progress"] = await bulk_insert(
+        db, Progress, generate_progress(rng["progress"], user_ids, course_ids, request.progress_per_user), chunk_size,
+    )
+
+    elapsed = time.perf_counter() - start
+    rows = sum(report.values())
+    report.update({"rows": rows, "seconds": round(elapsed, 3), "rows_per_sec": round(rows / elapsed) if elapsed else 0})
+    logger.info("Seeded %s rows in %.2fs (%s rows/sec)", rows, elapsed, report["rows_per_sec"])
+    return report
 
-# Seed all data
+# Seed a generated dataset into the database
 @router.post("/seed_all", status_code=200)
-async def seed_all():
-    """Seed users, courses, and quizzes into the database."""
+async def seed_all(request: SeedRequest = SeedRequest(), db: AsyncSession = Depends(get_async_db)):
+    """Seed users, courses, quizzes and progress into the database."""
     try:
-        seed_users()
-        seed_courses()
-        seed_quizzes()
-        return {"message": "Seeding completed successfully."}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        report = await seed_database(db, request)
+    except Exception:
+        # The details stay in the log; database errors can carry SQL and row values
+        logger.exception("Seeding failed")
+        raise HTTPException(status_code=500, detail="Seeding failed")
+    return {"message": "Seeding completed successfully.", **report}
 
+async def seed_main(request: SeedRequest, chunk_size: int):
+    async with AsyncSessionLocal() as db:
+        return await seed_database(db, request, chunk_size)
 
-# Optional: Add more seeding functions for other models (like enrollments, progress tracking, etc.)
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the database with generated data.")
+    for name, field in SeedRequest.model_fields.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=field.default)
+    parser.add_argument("--chunk-size", type=int, default=SEED_CHUNK_SIZE)
+    args = vars(parser.parse_args())
+    chunk_size = args.pop("chunk_size")
+    init_db()
+    # The CLI is not bound by the endpoint's limits
+    report = asyncio.run(seed_main(SeedRequest.model_construct(**args), chunk_size))
+    for table, value in report.items():
+        print(f"{table:>16}: {value}")
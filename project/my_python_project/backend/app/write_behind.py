@@ -0,0 +1,170 @@
+# Backend/app/write_behind.py
+
+"""Write-behind buffering for high-volume, last-write-wins rows (quiz scores, course progress).
+
+Writes are coalesced in memory per key, so a user resubmitting the same quiz ten times
+during an exam produces one row write, and are flushed as one batched upsert when
+WRITE_BEHIND_INTERVAL seconds pass or WRITE_BEHIND_MAX_PENDING keys are waiting.
+
+Durability: a write is acknowledged to the client before it reaches the database. A
+clean shutdown flushes everything (see flush_all, called from the app's shutdown hook),
+but if a worker process crashes or is killed, up to WRITE_BEHIND_INTERVAL seconds (or
+WRITE_BEHIND_MAX_PENDING keys) of that worker's writes are lost. Set WRITE_BEHIND=false
+to write through on every request when that trade-off is not acceptable.
+
+Failures: when a batch is rejected for its data (IntegrityError or DataError, e.g. a
+score for a user that does not exist), it is split in halves and retried until the bad
+rows are isolated; those are dropped to the dead-letter log straight away and the rest
+is written. Any other failure (e.g. the database being unreachable) keeps the rows and
+retries them on the next flush, up to WRITE_BEHIND_MAX_ATTEMPTS times per row before it
+is dead-lettered too. Either way one bad row cannot hold up every later write.
+
+With WRITE_BEHIND=false, the request that wrote the row is still waiting for it, so a
+failure is raised to that request instead: nothing is retried or dead-lettered.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+from sqlalchemy.exc import DataError, IntegrityError
+from app.db import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+# Rows dropped after failing to write are logged here, with the row, so they can be replayed
+dead_letter_logger = logging.getLogger(__name__ + ".dead_letter")
+
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "true").lower() in ("1", "true", "yes")
+WRITE_BEHIND_INTERVAL = float(os.getenv("WRITE_BEHIND_INTERVAL", "1.0"))
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "1000"))
+WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv("WRITE_BEHIND_MAX_ATTEMPTS", "5"))
+
+# Errors caused by the rows themselves; retrying the same rows can never succeed
+ROW_ERRORS = (IntegrityError, DataError)
+
+# Every buffer, so the application can flush them all on shutdown
+BUFFERS: List["WriteBehindBuffer"] = []
+
+class WriteBehindBuffer:
+    """Coalesces rows by key and hands them to flush_rows(db, rows) in batches."""
+
+    def __init__(
+        self,
+        name: str,
+        flush_rows: Callable[[Any, List[dict]], Awaitable[None]],
+        interval: float = WRITE_BEHIND_INTERVAL,
+        max_pending: int = WRITE_BEHIND_MAX_PENDING,
+        enabled: bool = WRITE_BEHIND,
+        max_attempts: int = WRITE_BEHIND_MAX_ATTEMPTS,
+    ):
+        self.name = name
+        self.flush_rows = flush_rows
+        self.interval = interval
+        self.max_pending = max_pending
+        self.enabled = enabled
+        self.max_attempts = max_attempts
+        self.session_factory = AsyncSessionLocal
+        self.pending: Dict[Hashable, dict] = {}
+        self.attempts: Dict[Hashable, int] = {}  # Failed flushes per pending key
+        self.flushed_rows = 0
+        self.coalesced_rows = 0
+        self.dead_lettered_rows = 0
+        self._lock = asyncio.Lock()
+        self._task = None
+        BUFFERS.append(self)
+
+    async def add(self, key: Hashable, row: dict):
+        """Queue a row, replacing any pending row with the same key."""
+        if key in self.pending:
+            self.coalesced_rows += 1
+        self.pending[key] = row
+        if not self.enabled or len(self.pending) >= self.max_pending:
+            await self.flush()
+        elif self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_periodically())
+
+    async def flush(self):
+        """Write all pending rows now; raises if rows were kept back for another attempt, or failed writing through."""
+        async with self._lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, {}
+            failures = await self._write(batch)
+            self.flushed_rows += len(batch) - len(failures)
+            retry_error = None
+            for key in batch.keys() - failures.keys():
+                self.attempts.pop(key, None)
+            if failures and not self.enabled:
+                # Writing through: the caller that added the rows gets the error, as with a direct write
+                for key in failures:
+                    self.attempts.pop(key, None)
+                raise next(iter(failures.values()))
+            for key, error in failures.items():
+                if key in self.pending:
+                    # A newer write for the same key arrived meanwhile and supersedes this row
+                    self.attempts.pop(key, None)
+                    continue
+                attempts = self.attempts.pop(key, 0) + 1
+                if isinstance(error, ROW_ERRORS) or attempts >= self.max_attempts:
+                    self.dead_letter(batch[key], error, attempts)
+                else:
+                    self.pending[key] = batch[key]
+                    self.attempts[key] = attempts
+                    retry_error = error
+            if retry_error is not None:
+                raise retry_error
+
+    async def _write(self, batch: Dict[Hashable, dict]) -> Dict[Hashable, Exception]:
+        """Write a batch, splitting it to isolate rows rejected for their data; returns the failures."""
+        try:
+            async with self.session_factory() as db:
+                await self.flush_rows(db, list(batch.values()))
+        except ROW_ERRORS as e:
+            if len(batch) == 1:
+                return {key: e for key in batch}
+            items = list(batch.items())
+            half = len(items) // 2
+            failures = await self._write(dict(items[:half]))
+            failures.update(await self._write(dict(items[half:])))
+            return failures
+        except Exception as e:
+            return {key: e for key in batch}
+        return {}
+
+    def dead_letter(self, row: dict, error: Exception, attempts: int):
+        self.dead_lettered_rows += 1
+        dead_letter_logger.error(
+            "Dropped %s row after %s attempt(s): %s: %s; row=%r", self.name, attempts, type(error).__name__, error, row,
+        )
+
+    async def _flush_periodically(self):
+        while self.pending:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Write-behind flush of %s failed; will retry", self.name)
+
+    async def close(self):
+        """Stop the timer and flush what is left."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self.pending),
+            "flushed": self.flushed_rows,
+            "coalesced": self.coalesced_rows,
+            "dead_lettered": self.dead_lettered_rows,
+        }
+
+async def flush_all():
+    """Flush every buffer; call on application shutdown."""
+    for buffer in BUFFERS:
+        await buffer.close()
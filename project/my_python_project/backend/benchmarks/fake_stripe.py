@@ -0,0 +1,41 @@
+# Backend/benchmarks/fake_stripe.py
+
+"""A local stand-in for the stripe package, so benchmarks never call the real API.
+
+install() puts this module in sys.modules["stripe"] before the app is imported. Only
+what app/routers/payments.py uses is provided: stripe.api_key and
+stripe.checkout.Session.create. STRIPE_LATENCY seconds of blocking sleep per call
+imitate the network round trip (the checkout endpoint is a sync handler, so this ties
+up a threadpool worker just like the real client would).
+"""
+
+import itertools
+import sys
+import time
+import types
+
+STRIPE_LATENCY = 0.0
+
+api_key = None
+calls = []
+_ids = itertools.count(1)
+
+class CheckoutSession:
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.url = f"https://checkout.stripe.test/pay/{session_id}"
+
+    @classmethod
+    def create(cls, **params):
+        if STRIPE_LATENCY:
+            time.sleep(STRIPE_LATENCY)
+        calls.append(params)
+        return cls(f"cs_test_{next(_ids)}")
+
+checkout = types.SimpleNamespace(Session=CheckoutSession)
+
+def install(latency: float = 0.0):
+    """Make `import stripe` return this fake. Call before importing app.main."""
+    global STRIPE_LATENCY
+    STRIPE_LATENCY = latency
+    sys.modules["stripe"] = sys.modules[__name__]
@@ -0,0 +1,83 @@
+# Backend/benchmarks/import_time.py
+
+"""Import-time budget for the application.
+
+Importing app.main is most of what a new worker (or a test run) does before it can serve,
+so it is measured with `python -X importtime` in a fresh interpreter, --repeat times, and
+the fastest run is compared against --budget milliseconds. The modules that cost the most
+are listed, so a new eager import of a heavy package shows up by name:
+
+    python -m benchmarks.import_time --budget 1200
+
+Modules in LAZY_MODULES are imported on first use by the routers and must not be pulled
+in by importing the app at all; finding one is a failure regardless of the budget.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1200"))
+
+# Imported lazily: stripe by checkout, passlib and jose by sign-in (or the lifespan warm-up)
+LAZY_MODULES = ("stripe", "passlib", "jose")
+
+def parse_importtime(output: str) -> Dict[str, Tuple[int, int]]:
+    """Module -> (self µs, cumulative µs) from -X importtime output."""
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+def measure(module: str = "app.main") -> Dict[str, Tuple[int, int]]:
+    """Import `module` in a fresh interpreter and return its -X importtime table."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(result.stderr)
+
+def top_modules(modules: Dict[str, Tuple[int, int]], count: int) -> List[Tuple[str, int, int]]:
+    """The top-level packages and app modules that cost the most, by cumulative time."""
+    packages = {name: times for name, times in modules.items() if "." not in name or name.startswith("app.")}
+    ranked = sorted(packages.items(), key=lambda item: item[1][1], reverse=True)
+    return [(name, self_us, cumulative_us) for name, (self_us, cumulative_us) in ranked[:count]]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure how long importing the app takes.")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_MS, help="Milliseconds allowed for the import")
+    args = parser.parse_args(argv)
+
+    # The fastest run is the least disturbed by the rest of the machine
+    runs = [measure(args.module) for _ in range(args.repeat)]
+    best = min(runs, key=lambda modules: modules[args.module][1])
+    total_ms = best[args.module][1] / 1000
+
+    print(f"{'module':<32}{'self ms':>10}{'cumulative ms':>16}")
+    for name, self_us, cumulative_us in top_modules(best, args.top):
+        print(f"{name:<32}{self_us / 1000:>10.1f}{cumulative_us / 1000:>16.1f}")
+    print(f"import {args.module}: {total_ms:.1f} ms (budget {args.budget:.0f} ms, best of {args.repeat})")
+
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in best]
+    if eager:
+        print(f"FAIL imported eagerly: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget:
+        print(f"FAIL import took {total_ms:.1f} ms, over the {args.budget:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
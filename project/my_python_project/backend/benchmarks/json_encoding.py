@@ -0,0 +1,66 @@
+# Backend/benchmarks/json_encoding.py
+
+"""Encoded bytes/sec for large course listings, before and after the fast JSON path.
+
+Compares three ways of producing a response body for N courses:
+
+  default   FastAPI's previous path: jsonable_encoder + JSONResponse (json.dumps)
+  fast      FastJSONResponse on plain data (orjson when installed, no jsonable_encoder)
+  schema    CoursePage validated from ORM rows and dumped by pydantic's core
+
+Run from the backend directory:  python -m benchmarks.json_encoding --courses 10000
+"""
+
+import argparse
+import time
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app import responses
+from app.models.course import Course
+from app.responses import FastJSONResponse
+from app.schemas.course import CoursePage
+
+def make_courses(count: int):
+    return [
+        Course(
+            id=n,
+            title=f"Course {n}: an introduction to topic {n % 97}",
+            description=f"Lectures, exercises and a final project for course {n}. " * 3,
+            price=(n * 7) % 200,
+            video_url=f"/upload/files/course-{n}.mp4",
+        )
+        for n in range(1, count + 1)
+    ]
+
+def measure(name: str, encode, repeat: int):
+    """Run encode() repeat times; returns (name, bytes per call, MB/s)."""
+    size = len(encode())
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encode()
+    elapsed = time.perf_counter() - start
+    return name, size, size * repeat / elapsed / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON encoding of course listings.")
+    parser.add_argument("--courses", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    courses = make_courses(args.courses)
+    columns = [column.name for column in Course.__table__.columns]
+    page = {"items": [{name: getattr(course, name) for name in columns} for course in courses], "next_cursor": None}
+
+    results = [
+        measure("default", lambda: JSONResponse(jsonable_encoder(page)).body, args.repeat),
+        measure("fast", lambda: FastJSONResponse(page).body, args.repeat),
+        measure("schema", lambda: CoursePage(items=courses).model_dump_json().encode(), args.repeat),
+    ]
+    encoder = "orjson" if responses.orjson is not None else "json (orjson not installed)"
+    print(f"{args.courses} courses, {args.repeat} runs, fast path encoder: {encoder}")
+    baseline = results[0][2]
+    for name, size, rate in results:
+        print(f"  {name:<8} {size:>10} bytes  {rate:8.1f} MB/s  {rate / baseline:5.1f}x")
+
+if __name__ == "__main__":
+    main()
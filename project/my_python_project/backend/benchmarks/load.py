@@ -0,0 +1,288 @@
+# Backend/benchmarks/load.py
+
+"""Load benchmarks for the API: latency percentiles and throughput per scenario.
+
+Each scenario (login, list/get course, get quiz, submit quiz, upload, checkout) sends
+--requests requests from --concurrency concurrent clients against a freshly seeded
+SQLite database, after --warmup untimed requests. The app is driven either in-process
+through httpx's ASGI transport (--transport asgi, no sockets, measures the app alone)
+or over HTTP against uvicorn started on a local port (--transport uvicorn). Stripe is
+replaced by benchmarks/fake_stripe.py.
+
+Results can be saved as a JSON baseline and compared against one later; a scenario
+whose p95 latency or throughput is worse than the baseline by more than --tolerance
+is reported as a regression and the exit status is 1:
+
+    python -m benchmarks.load --save benchmarks/baseline.json
+    python -m benchmarks.load --baseline benchmarks/baseline.json
+
+Numbers are only comparable between runs on the same machine with the same options.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks import fake_stripe
+
+SCENARIOS: Dict[str, Callable[["Context", httpx.AsyncClient, int], Awaitable[httpx.Response]]] = {}
+
+def scenario(name: str):
+    def register(function):
+        SCENARIOS[name] = function
+        return function
+    return register
+
+class Context:
+    """Data the scenarios share: seeded ids, the seeded users' password and a deterministic RNG."""
+
+    def __init__(self, seed: int, users: int, password: str, course_ids: List[int], quiz_ids: List[int], upload_size: int):
+        self.rng = random.Random(seed)
+        self.users = users
+        self.password = password
+        self.course_ids = course_ids
+        self.quiz_ids = quiz_ids
+        self.upload_size = upload_size
+
+@scenario("login")
+async def login(ctx: Context, client: httpx.AsyncClient, n: int) -> httpx.Response:
+    username = f"user{ctx.rng.randint(1, ctx.users)}"
+    return await client.post("/auth/login", json={"username": username, "password": ctx.password})
+
+@scenario("list_courses")
+async def list_courses(ctx: Context, client: httpx.AsyncClient, n: int) -> httpx.Response:
+    return await client.get("/courses/", params={"limit": 20})
+
+@scenario("get_course")
+async def get_course(ctx: Context, client: httpx.AsyncClient, n: int) -> httpx.Response:
+    return await client.get(f"/courses/{ctx.rng.choice(ctx.course_ids)}")
+
+@scenario("get_quiz")
+async def get_quiz(ctx: Context, client: httpx.AsyncClient, n: int) -> httpx.Response:
+    return await client.get(f"/quizzes/get_quiz/{ctx.rng.choice(ctx.quiz_ids)}")
+
+@scenario("submit_quiz")
+async def submit_quiz(ctx: Context, client: httpx.AsyncClient, n: int) -> httpx.Response:
+    from app.routers.auth import create_access_token
+
+    # Submissions are scored for the signed-in user; tokens are minted directly to skip bcrypt
+    token = create_access_token({"sub": f"user{ctx.rng.randint(1, ctx.users)}"})
+    quiz_id = ctx.rng.choice(ctx.quiz_ids)
+    answers = [{"question_id": question, "selected_answer": ctx.rng.randrange(4)} for question in range(5)]
+    return await client.post(
+        f"/quizzes/submit_quiz/{quiz_id}",
+        json={"quiz_id": quiz_id, "answers": answers},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+@scenario("upload")
+async def upload(ctx: Context, client: httpx.AsyncClient, n: int) -> httpx.Response:
+    # Distinct names and contents, so every request stores a new blob
+    content = f"{n}:".encode() + ctx.rng.randbytes(ctx.upload_size)
+    files = {"file": (f"bench-{time.time_ns()}-{n}.pdf", content, "application/pdf")}
+    return await client.post("/upload/upload_course_material", files=files)
+
+@scenario("checkout")
+async def checkout(ctx: Context, client: httpx.AsyncClient, n: int) -> httpx.Response:
+    return await client.post("/payments/create-checkout-session", params={"course_id": ctx.rng.choice(ctx.course_ids)})
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def run_scenario(
+    name: str, ctx: Context, client: httpx.AsyncClient, requests: int, concurrency: int, warmup: int,
+) -> dict:
+    function = SCENARIOS[name]
+    for n in range(warmup):
+        await function(ctx, client, -n - 1)
+
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    remaining = iter(range(requests))
+
+    async def worker():
+        for n in remaining:
+            start = time.perf_counter()
+            try:
+                response = await function(ctx, client, n)
+                failed = None if response.status_code < 400 else str(response.status_code)
+            except httpx.HTTPError as e:
+                failed = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            if failed:
+                errors[failed] = errors.get(failed, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    ordered = sorted(latencies)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 2),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+    }
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions against a baseline: p95 up or throughput down by more than tolerance."""
+    regressions = []
+    for option in ("transport", "requests", "concurrency"):
+        if report["meta"].get(option) != baseline["meta"].get(option):
+            regressions.append(f"baseline was recorded with {option}={baseline['meta'].get(option)}; results are not comparable")
+    for name, result in report["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']} ms -> {result['p95_ms']} ms")
+        if result["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput_rps']} -> {result['throughput_rps']} req/s")
+    return regressions
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class UvicornThread:
+    """Runs uvicorn in a background thread of this process, sharing the seeded app."""
+
+    def __init__(self, app, port: int):
+        import uvicorn
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join()
+
+async def prepare(args) -> Context:
+    """Create the schema and seed the benchmark database."""
+    from sqlalchemy import select
+    from app.db import AsyncSessionLocal, async_engine, init_db
+    from app.models.course import Course
+    from app.models.quiz import Quiz
+    from app.seed import SEED_PASSWORD, SeedRequest, seed_database
+
+    init_db()
+    async with AsyncSessionLocal() as db:
+        await seed_database(db, SeedRequest.model_construct(
+            users=args.users, courses=args.courses, quizzes=args.quizzes, questions_per_quiz=5,
+            options_per_question=4, progress_per_user=2, seed=args.seed,
+        ))
+        course_ids = list((await db.scalars(select(Course.id))).all())
+        quiz_ids = list((await db.scalars(select(Quiz.id))).all())
+    # Connections belong to this event loop; uvicorn serves from its own
+    await async_engine.dispose()
+    return Context(args.seed, args.users, SEED_PASSWORD, course_ids, quiz_ids, args.upload_size)
+
+async def run(args, app) -> dict:
+    ctx = await prepare(args)
+    results = {}
+    if args.transport == "asgi":
+        # raise_app_exceptions=False so a server error counts as a 500 instead of ending the run
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for name in args.scenarios:
+                    results[name] = await run_scenario(name, ctx, client, args.requests, args.concurrency, args.warmup)
+    else:
+        port = free_port()
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        with UvicornThread(app, port):
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+                for name in args.scenarios:
+                    results[name] = await run_scenario(name, ctx, client, args.requests, args.concurrency, args.warmup)
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark API scenarios and compare against a baseline.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--transport", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--quizzes", type=int, default=50)
+    parser.add_argument("--upload-size", type=int, default=64 * 1024)
+    parser.add_argument("--stripe-latency", type=float, default=0.0, help="Seconds each fake Stripe call takes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before flagging, e.g. 0.2 = 20%%")
+    args = parser.parse_args(argv)
+
+    # Point the app at throwaway storage before it is imported; modules read these at import time
+    workdir = Path(tempfile.mkdtemp(prefix="course-bench-"))
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ.setdefault("BCRYPT_ROUNDS", "12")
+    fake_stripe.install(args.stripe_latency)
+
+    from app.main import app
+    from app.routers import upload
+    upload.UPLOAD_FOLDER = workdir / "uploads"
+
+    try:
+        results = asyncio.run(run(args, app))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    report = {
+        "meta": {
+            "transport": args.transport,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+    print(f"{'scenario':<14}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  errors")
+    for name, result in results.items():
+        print(
+            f"{name:<14}{result['throughput_rps']:>10.1f}{result['p50_ms']:>10.2f}"
+            f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}  {result['errors'] or ''}"
+        )
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2) + "\n")
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+# Backend/app/tests/conftest.py
+
+import anyio
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app import search  # noqa: F401  (registers the search index on the metadata)
+from app.db import Base
+from app.models import course, job, material, quiz, user  # noqa: F401
+
+class TestingDatabase:
+    """A throwaway SQLite file with every table, and sync and async session factories on it."""
+
+    __test__ = False  # Not a test class, despite the name
+
+    def __init__(self, path, **session_options):
+        self.path = path
+        self.engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=self.engine)
+        self.async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        self.Session = sessionmaker(bind=self.engine)
+        self.AsyncSession = async_sessionmaker(bind=self.async_engine, **session_options)
+
+    async def override_get_async_db(self):
+        """Stand-in for app.db.get_async_db: app.dependency_overrides[get_async_db] = database.override_get_async_db"""
+        async with self.AsyncSession() as db:
+            yield db
+
+    def dispose(self):
+        self.engine.dispose()
+        anyio.run(self.async_engine.dispose)
+
+# Factory for test databases under tmp_path; every engine it creates is disposed after the test
+@pytest.fixture()
+def make_database(tmp_path):
+    databases = []
+
+    def make(name: str = "test.db", **session_options) -> TestingDatabase:
+        database = TestingDatabase(tmp_path / name, **session_options)
+        databases.append(database)
+        return database
+
+    yield make
+    for database in databases:
+        database.dispose()
+
+# One test database per test
+@pytest.fixture()
+def database(make_database) -> TestingDatabase:
+    return make_database()
@@ -0,0 +1,90 @@
+# Backend/app/tests/test_auth_flow.py
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy import func, select
+from app.db import get_async_db
+from app.models.user import User
+from app.routers import auth
+
+# Build an app with just the auth router on a throwaway SQLite file, hashing at the cheapest bcrypt cost
+@pytest.fixture()
+def client(monkeypatch, database):
+    monkeypatch.setattr(auth, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=4))
+    auth.token_cache.clear()
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+    app.dependency_overrides[get_async_db] = database.override_get_async_db
+
+    # A protected route that depends on the current user and on the raw claims
+    @app.get("/me")
+    async def me(username: str = Depends(auth.get_current_user), claims: dict = Depends(auth.get_token_claims)):
+        return {"username": username, "sub": claims["sub"]}
+
+    with TestClient(app) as client:
+        yield client
+
+# Test registering a new user with hashing done on the password pool
+def test_register(client):
+    response = client.post("/auth/register", json={"username": "newuser", "password": "secret"})
+    assert response.status_code == 200
+    assert auth.pending_password_jobs == 0
+
+# Test that the unique username index rejects a second registration
+def test_register_duplicate(client):
+    client.post("/auth/register", json={"username": "newuser", "password": "secret"})
+    response = client.post("/auth/register", json={"username": "newuser", "password": "other"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Username already registered"
+
+# Test logging in against the stored user
+def test_login(client):
+    client.post("/auth/register", json={"username": "newuser", "password": "secret"})
+    response = client.post("/auth/login", json={"username": "newuser", "password": "secret"})
+    assert response.status_code == 200
+    assert "access_token" in response.json()
+
+    response = client.post("/auth/login", json={"username": "newuser", "password": "wrong"})
+    assert response.status_code == 401
+
+# Test bulk importing users in chunks, skipping existing usernames
+def test_import_users(client, database):
+    client.post("/auth/register", json={"username": "user0", "password": "secret"})
+    rows = [{"username": f"user{i}", "hashed_password": "x"} for i in range(5)]
+
+    async def run_import():
+        async with database.AsyncSession() as db:
+            inserted = await auth.import_users(db, rows, chunk_size=2)
+            total = await db.scalar(select(func.count()).select_from(User))
+            return inserted, total
+
+    inserted, total = client.portal.call(run_import)
+    assert inserted == 4
+    assert total == 5
+
+# Test that a full password queue is rejected instead of blocking
+def test_login_back_pressure(client, monkeypatch):
+    monkeypatch.setattr(auth, "PASSWORD_QUEUE_LIMIT", 0)
+    response = client.post("/auth/register", json={"username": "newuser", "password": "secret"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+# Test that verified tokens are decoded once and then served from the token cache
+def test_token_claims_cached(client):
+    token = auth.create_access_token(data={"sub": "testuser"})
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/me", headers=headers).json() == {"username": "testuser", "sub": "testuser"}
+    client.get("/me", headers=headers)
+    stats = auth.token_cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+# Test that bad or missing tokens are rejected and not cached
+def test_invalid_token(client):
+    response = client.get("/me", headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Could not validate credentials"
+    assert auth.token_cache.stats()["entries"] == 0
+    assert client.get("/me").status_code == 401
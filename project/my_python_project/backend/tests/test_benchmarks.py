@@ -0,0 +1,41 @@
+# Backend/app/tests/test_benchmarks.py
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.routers import payments
+from benchmarks import fake_stripe
+from benchmarks.load import compare, percentile
+
+def report(p95_ms, throughput_rps, transport="asgi"):
+    return {
+        "meta": {"transport": transport, "requests": 100, "concurrency": 10},
+        "results": {"get_course": {"p95_ms": p95_ms, "throughput_rps": throughput_rps}},
+    }
+
+# Test nearest-rank percentiles
+def test_percentile():
+    ordered = [float(n) for n in range(1, 101)]
+    assert percentile(ordered, 50) == 50.0
+    assert percentile(ordered, 95) == 95.0
+    assert percentile(ordered, 99) == 99.0
+    assert percentile([7.0], 99) == 7.0
+
+# Test that only slowdowns beyond the tolerance are flagged, and mismatched runs are refused
+def test_compare_flags_regressions():
+    baseline = report(10.0, 1000.0)
+    assert compare(report(11.0, 900.0), baseline, tolerance=0.2) == []
+    assert compare(report(13.0, 700.0), baseline, tolerance=0.2) == [
+        "get_course: p95 10.0 ms -> 13.0 ms",
+        "get_course: throughput 1000.0 -> 700.0 req/s",
+    ]
+    assert "not comparable" in compare(report(10.0, 1000.0, transport="uvicorn"), baseline, tolerance=0.2)[0]
+
+# Test that the checkout endpoint runs against the fake Stripe
+def test_checkout_with_fake_stripe(monkeypatch):
+    monkeypatch.setattr(payments, "stripe", fake_stripe)
+    app = FastAPI()
+    app.include_router(payments.router)
+    response = TestClient(app).post("/payments/create-checkout-session", params={"course_id": 3})
+    assert response.status_code == 200
+    assert response.json()["checkout_url"].startswith("https://checkout.stripe.test/pay/cs_test_")
+    assert fake_stripe.calls[-1]["line_items"][0]["price_data"]["product_data"]["name"] == "Course #3"
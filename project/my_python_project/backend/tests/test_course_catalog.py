@@ -0,0 +1,178 @@
+# Backend/app/tests/test_course_catalog.py
+
+import base64
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from app.cache import LRUCache, course_cache
+from app.db import get_async_db
+from app.models.course import Course
+from app.models.quiz import Progress
+from app.routers import courses
+
+# Test database for the client fixture and for inspecting what it wrote
+@pytest.fixture()
+def database(make_database):
+    return make_database("catalog.db", expire_on_commit=False)
+
+# Build an app with just the courses router, backed by a throwaway SQLite file
+@pytest.fixture()
+def client(database):
+    with database.Session() as db:
+        db.add_all([
+            Course(title=f"Course {i}", description=f"About {i}", price=10 * i, video_url=f"/videos/{i}.mp4")
+            for i in range(1, 6)
+        ])
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(courses.router)
+    app.dependency_overrides[get_async_db] = database.override_get_async_db
+    course_cache.clear()
+    courses.progress_buffer.session_factory = database.AsyncSession
+    with TestClient(app) as client:
+        yield client
+        client.portal.call(courses.progress_buffer.close)
+    course_cache.clear()
+
+# Test listing courses through the async session
+def test_list_courses(client):
+    response = client.get("/courses/")
+    assert response.status_code == 200
+    assert [c["id"] for c in response.json()["items"]] == [1, 2, 3, 4, 5]
+    assert response.json()["next_cursor"] is None
+
+# Test walking the catalog page by page with the next cursor
+def test_list_courses_pagination(client):
+    first = client.get("/courses/", params={"limit": 2}).json()
+    assert [c["id"] for c in first["items"]] == [1, 2]
+
+    second = client.get("/courses/", params={"limit": 2, "after": first["next_cursor"]}).json()
+    assert [c["id"] for c in second["items"]] == [3, 4]
+
+    last = client.get("/courses/", params={"limit": 2, "after": second["next_cursor"]}).json()
+    assert [c["id"] for c in last["items"]] == [5]
+    assert last["next_cursor"] is None
+
+# Test projecting a subset of course fields
+def test_list_courses_fields(client):
+    response = client.get("/courses/", params={"fields": "title,price"})
+    assert response.status_code == 200
+    assert response.json()["items"][0] == {"id": 1, "title": "Course 1", "price": 10}
+
+    assert client.get("/courses/", params={"fields": "secret"}).status_code == 400
+    assert client.get("/courses/", params={"after": "not a cursor"}).status_code == 400
+
+# Test fetching a single course through the async session
+def test_get_course(client):
+    response = client.get("/courses/3")
+    assert response.status_code == 200
+    assert response.json()["title"] == "Course 3"
+
+# Test fetching a course that does not exist
+def test_get_course_not_found(client):
+    response = client.get("/courses/99999")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Course not found"
+
+# Test that repeated reads are served from the cache
+def test_get_course_cached(client):
+    before = course_cache.stats()
+    client.get("/courses/2")
+    client.get("/courses/2")
+    after = course_cache.stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+# Test that course writes invalidate cached rows and pages
+def test_course_writes_invalidate_cache(client):
+    assert client.get("/courses/1").json()["title"] == "Course 1"
+    assert len(client.get("/courses/").json()["items"]) == 5
+
+    response = client.put("/courses/1", json={"title": "Renamed"})
+    assert response.status_code == 200
+    assert client.get("/courses/1").json()["title"] == "Renamed"
+
+    response = client.post("/courses/", json={"title": "New", "description": "Fresh", "price": 5})
+    assert response.status_code == 201
+    assert len(client.get("/courses/").json()["items"]) == 6
+
+    assert client.delete(f"/courses/{response.json()['id']}").status_code == 200
+    assert len(client.get("/courses/").json()["items"]) == 5
+
+# Test TTL expiry and LRU eviction of the in-process cache
+def test_lru_cache_eviction_and_ttl():
+    cache = LRUCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    cache.set("d", 4, ttl=0)
+    assert cache.get("d") is None
+    assert cache.stats()["evictions"] >= 1
+
+# Test ETag revalidation of a single course
+def test_get_course_etag(client):
+    response = client.get("/courses/1")
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "public, no-cache"
+
+    response = client.get("/courses/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    client.put("/courses/1", json={"price": 999})
+    response = client.get("/courses/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+# Test that progress updates are buffered and flushed as one upsert per student and course
+def test_update_progress(client, database):
+    for progress in (10, 40, 75.4):
+        response = client.post("/courses/progress", json={"course_id": 1, "student_id": 7, "progress": progress})
+        assert response.status_code == 202
+    client.post("/courses/progress", json={"course_id": 2, "student_id": 7, "progress": 5})
+
+    assert courses.progress_buffer.stats()["coalesced"] >= 2
+    client.portal.call(courses.progress_buffer.flush)
+    with database.Session() as db:
+        rows = db.scalars(select(Progress).order_by(Progress.course_id)).all()
+        assert [(row.course_id, row.completed) for row in rows] == [(1, 75), (2, 5)]
+
+# Test ranked prefix search, pagination, and that course writes update the index
+def test_search_courses(client):
+    client.post("/courses/", json={"title": "Intro to Python", "description": "Programming basics"})
+    client.post("/courses/", json={"title": "Cooking", "description": "Python-free recipes for programmers"})
+    client.post("/courses/", json={"title": "Advanced Pythonic Patterns", "description": "Decorators"})
+
+    items = client.get("/courses/search", params={"q": "pyth"}).json()["items"]
+    # Title matches outrank description matches
+    assert [item["title"] for item in items][-1] == "Cooking"
+    assert len(items) == 3
+    assert [item["title"] for item in client.get("/courses/search", params={"q": "python prog"}).json()["items"]] == [
+        "Intro to Python", "Cooking",
+    ]
+
+    page = client.get("/courses/search", params={"q": "pyth", "limit": 2}).json()
+    assert len(page["items"]) == 2
+    rest = client.get("/courses/search", params={"q": "pyth", "after": page["next_cursor"]}).json()
+    assert [item["id"] for item in page["items"] + rest["items"]] == [item["id"] for item in items]
+    assert rest["next_cursor"] is None
+
+    # Seeded rows written before the request are indexed too
+    assert [item["title"] for item in client.get("/courses/search", params={"q": "about"}).json()["items"]][:1] == ["Course 1"]
+
+    cooking = next(item for item in items if item["title"] == "Cooking")
+    client.put(f"/courses/{cooking['id']}", json={"description": "Recipes"})
+    client.delete(f"/courses/{items[0]['id']}")
+    assert len(client.get("/courses/search", params={"q": "pyth"}).json()["items"]) == 1
+    assert client.get("/courses/search", params={"q": "!!"}).json() == {"items": [], "next_cursor": None}
+
+    # Offsets must be non-negative integers
+    for offset in ("-1", "1.5", " 2", "abc"):
+        cursor = base64.urlsafe_b64encode(offset.encode()).decode()
+        assert client.get("/courses/search", params={"q": "pyth", "after": cursor}).status_code == 400
@@ -0,0 +1,33 @@
+# Backend/app/tests/test_db.py
+
+from sqlalchemy import create_engine, text
+from app.db import TimedQueuePool, engine_options, pool_stats, to_async_url
+
+# Test that async URLs are derived from the sync DATABASE_URL
+def test_to_async_url():
+    assert to_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert to_async_url("postgresql+psycopg2://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+
+# Test that connect args are picked per dialect instead of always using the SQLite hack
+def test_engine_options_by_dialect():
+    sqlite_options = engine_options("sqlite:///./test.db")
+    assert sqlite_options["connect_args"] == {"check_same_thread": False}
+    assert sqlite_options["poolclass"] is TimedQueuePool
+
+    postgres_options = engine_options("postgresql+asyncpg://u:p@db/app", is_async=True)
+    assert "check_same_thread" not in postgres_options["connect_args"]
+    assert "timeout" in postgres_options["connect_args"]
+
+    assert "poolclass" not in engine_options("sqlite://")
+
+# Test that the pool snapshot tracks checked-out connections and wait times
+def test_pool_stats(tmp_path):
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(url, **engine_options(url))
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        snapshot = pool_stats(engine)
+        assert snapshot["checked_out"] == 1
+        assert snapshot["waits"] == 1
+    assert pool_stats(engine)["idle"] == 1
+    engine.dispose()
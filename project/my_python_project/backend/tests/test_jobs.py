@@ -0,0 +1,80 @@
+# Backend/app/tests/test_jobs.py
+
+import time
+import pytest
+from app import jobs
+from app.models.job import Job
+
+# Session factory on a throwaway SQLite file with the jobs table
+@pytest.fixture()
+def session_factory(database, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_RETRY_DELAY", 0)
+    return database.Session
+
+def add_job(session_factory, job_type: str, max_attempts: int = 3, status: str = "queued") -> int:
+    with session_factory() as db:
+        job = Job(job_type=job_type, payload="{}", status=status, attempts=0, max_attempts=max_attempts, run_after=0)
+        db.add(job)
+        db.commit()
+        return job.id
+
+# Test that a failing job is retried and then marked failed
+def test_job_retries(session_factory):
+    calls = []
+
+    def flaky(payload):
+        calls.append(payload)
+        raise RuntimeError("boom")
+
+    worker = jobs.JobWorker(session_factory, {"flaky": jobs.JobType("flaky", flaky, concurrency=1, max_attempts=2)})
+    job_id = add_job(session_factory, "flaky", max_attempts=2)
+    assert worker.run_once() and worker.run_once()
+    assert worker.run_once() is False
+    with session_factory() as db:
+        job = db.get(Job, job_id)
+        assert (job.status, job.attempts) == ("failed", 2)
+        assert "boom" in job.error
+    assert len(calls) == 2
+
+# Test that the per-type concurrency limit holds while a job of that type is running
+def test_job_concurrency_limit(session_factory):
+    worker = jobs.JobWorker(session_factory, {"probe": jobs.JobType("probe", lambda payload: {"ok": True}, 1, 3)})
+    add_job(session_factory, "probe", status="running")
+    queued_id = add_job(session_factory, "probe")
+    assert worker.run_once() is False
+
+    with session_factory() as db:
+        assert worker.requeue_stale(timeout=-1) == 0  # leased_at is unset, so nothing is stale
+        db.query(Job).filter(Job.status == "running").update({"status": "succeeded"})
+        db.commit()
+    assert worker.run_once() is True
+    with session_factory() as db:
+        assert db.get(Job, queued_id).status == "succeeded"
+
+# Test that stale running jobs are requeued, or failed once they are out of attempts
+def test_requeue_stale(session_factory):
+    worker = jobs.JobWorker(session_factory, {})
+    retry_id = add_job(session_factory, "crashy", status="running")
+    spent_id = add_job(session_factory, "crashy", max_attempts=1, status="running")
+    with session_factory() as db:
+        db.query(Job).update({"attempts": 1, "started_at": 0, "leased_at": 0})
+        db.commit()
+    assert worker.requeue_stale(timeout=60) == 1
+    with session_factory() as db:
+        assert db.get(Job, retry_id).status == "queued"
+        spent = db.get(Job, spent_id)
+        assert (spent.status, spent.error) == ("failed", "Worker stopped while running the job")
+
+# Test that a job running longer than the lease timeout keeps its lease through heartbeats
+def test_job_heartbeat(session_factory):
+    def slow(payload):
+        time.sleep(0.3)
+        return {"requeued": worker.requeue_stale(timeout=0.15)}
+
+    worker = jobs.JobWorker(session_factory, {"slow": jobs.JobType("slow", slow, 1, 1)}, heartbeat_interval=0.05)
+    job_id = add_job(session_factory, "slow")
+    assert worker.run_once() is True
+    with session_factory() as db:
+        job = db.get(Job, job_id)
+        assert (job.status, job.result) == ("succeeded", '{"requeued": 0}')
+        assert job.leased_at > job.started_at
@@ -0,0 +1,84 @@
+# Backend/app/tests/test_metrics.py
+
+import json
+import os
+import pytest
+from fastapi.testclient import TestClient
+from app import metrics, profiling
+from app.db import get_async_db
+from app.main import app
+
+def snapshot(**samples):
+    """A worker snapshot in the on-disk format: metric name -> [[labels, value], ...]."""
+    return {name: [[list(map(list, labels)), value] for labels, value in values] for name, values in samples.items()}
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.COUNTERS.clear()
+    profiling.ROUTE_STATS.clear()
+    yield
+    metrics.COUNTERS.clear()
+    profiling.ROUTE_STATS.clear()
+
+# Test the exposition format for counters and histograms
+def test_render():
+    metrics.inc("quiz_submissions_total")
+    metrics.inc("upload_bytes_total", 512, kind="direct")
+    stats = profiling.ROUTE_STATS[("GET", "/courses/{course_id}")] = profiling.RouteStats()
+    stats.latency.observe(0.02)
+    stats.latency.observe(3.0)
+    text = metrics.render(metrics.collect(directory=None))
+    assert "# TYPE quiz_submissions_total counter\nquiz_submissions_total 1.0\n" in text
+    assert 'upload_bytes_total{kind="direct"} 512.0' in text
+    labels = 'method="GET",route="/courses/{course_id}",router="courses"'
+    assert f'http_request_duration_seconds_bucket{{{labels},le="0.025"}} 1' in text
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"http_request_duration_seconds_count{{{labels}}} 2" in text
+    assert 'cache_hit_ratio{cache="courses"}' in text
+
+# Test that snapshots from other workers are added up, with gauges only from live ones
+def test_multiprocess_aggregation(tmp_path):
+    metrics.inc("quiz_submissions_total", 2)
+    metrics.write_snapshot(str(tmp_path))
+    assert json.loads((tmp_path / f"{os.getpid()}.json").read_text())["quiz_submissions_total"] == [[[], 2.0]]
+
+    dead_pid = 2 ** 22 + 1  # Above the default pid_max, so never a live process
+    histogram = [[0] * len(profiling.LATENCY_BUCKETS), 0.5, 1]
+    histogram[0][3] = 1
+    route = (("method", "GET"), ("route", "/health"), ("router", "health"))
+    (tmp_path / f"{os.getppid()}.json").write_text(json.dumps(snapshot(
+        quiz_submissions_total=[((), 3.0)],
+        http_requests_in_flight=[((), 4)],
+        http_request_duration_seconds=[(route, histogram)],
+        cache_hits_total=[((("cache", "elsewhere"),), 30)],
+        cache_misses_total=[((("cache", "elsewhere"),), 10)],
+    )))
+    (tmp_path / f"{dead_pid}.json").write_text(json.dumps(snapshot(
+        quiz_submissions_total=[((), 5.0)],
+        http_requests_in_flight=[((), 100)],
+        http_request_duration_seconds=[(route, histogram)],
+    )))
+    (tmp_path / "123.json.tmp").write_text("{")
+
+    collected = metrics.collect(str(tmp_path))
+    assert collected["quiz_submissions_total"][()] == 10.0
+    assert collected["http_requests_in_flight"][()] == 4
+    assert collected["http_request_duration_seconds"][route][2] == 2
+    assert collected["cache_hit_ratio"][(("cache", "elsewhere"),)] == pytest.approx(30 / 40, abs=0.01)
+
+# Test that readiness fails when the database cannot be reached
+def test_readiness(database):
+    client = TestClient(app)
+    try:
+        app.dependency_overrides[get_async_db] = database.override_get_async_db
+        assert client.get("/ready").json() == {"status": "Ready", "database": "ok"}
+        # The database file disappears from under the app
+        database.dispose()
+        database.path.unlink()
+        database.path.mkdir()
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "Unavailable"
+        assert client.get("/metrics").headers["content-type"].startswith("text/plain; version=0.0.4")
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,71 @@
+# Backend/app/tests/test_profiling.py
+
+import logging
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import profiling
+from app.db import get_async_db
+from app.models.course import Course
+
+# Build an app with the timing middleware and a route that queries once per course
+@pytest.fixture()
+def client(database):
+    profiling.instrument_engine(database.async_engine.sync_engine)
+    app = FastAPI()
+    app.add_middleware(profiling.RequestTimingMiddleware)
+    app.dependency_overrides[get_async_db] = database.override_get_async_db
+
+    @app.get("/items/{count}")
+    async def items(count: int, db: AsyncSession = Depends(get_async_db)):
+        for course_id in range(count):
+            await db.get(Course, course_id)
+        return {"count": count}
+
+    profiling.ROUTE_STATS.clear()
+    with TestClient(app) as client:
+        yield client
+    profiling.ROUTE_STATS.clear()
+
+# Test that queries are charged to the request and reported in Server-Timing
+def test_server_timing_and_route_stats(client):
+    response = client.get("/items/3")
+    assert response.status_code == 200
+    assert 'desc="3 queries"' in response.headers["server-timing"]
+    client.get("/items/1")
+
+    stats = profiling.ROUTE_STATS[("GET", "/items/{count}")]
+    assert stats.latency.count == 2
+    assert stats.db_queries == 4
+    assert profiling.route_stats()[0]["db_queries_per_request"] == 2.0
+    client.get("/missing")
+    assert profiling.ROUTE_STATS[("GET", "unmatched")].latency.count == 1
+
+# Test that a statement repeated past the threshold is flagged as a possible N+1
+def test_n_plus_one_warning(client, monkeypatch, caplog):
+    monkeypatch.setattr(profiling, "QUERY_REPEAT_WARNING", 4)
+    with caplog.at_level(logging.WARNING, logger="app.profiling"):
+        client.get("/items/4")
+        assert "N+1" not in caplog.text
+        client.get("/items/5")
+    assert "Possible N+1 in GET /items/{count}: statement ran 5 times" in caplog.text
+
+# Test that sampled requests slower than the threshold leave a profile behind
+def test_slow_request_profile(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(profiling, "PROFILE_SLOW_MS", 0.0)
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path / "profiles"))
+    client.get("/items/2")
+    profiles = list((tmp_path / "profiles").iterdir())
+    assert len(profiles) == 1 and profiles[0].name.endswith("ms.prof")
+    assert "GET-items_count" in profiles[0].name
+
+# Test the histogram's bucketed quantiles
+def test_histogram_quantiles():
+    histogram = profiling.Histogram()
+    for value in [0.001] * 90 + [0.3] * 9 + [20.0]:
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == 0.005
+    assert histogram.quantile(0.95) == 0.5
+    assert histogram.quantile(1.0) == float("inf")
@@ -0,0 +1,273 @@
+# Backend/app/tests/test_quizzes.py
+
+import asyncio
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from app.db import get_async_db
+from app.models import quiz as models
+from app.models.quiz import QuizScore, QuizScoreBucket, QuizStats
+from app.models.user import User
+from app.routers import auth, quizzes
+
+quiz_data = {
+    "title": "Python Basics Quiz",
+    "description": "Test your knowledge of basic Python programming",
+    "questions": [
+        {"question_text": "What is 2 + 2?", "options": ["3", "4", "5"], "correct_answer": 1},
+        {"question_text": "What does 'print' do?", "options": ["Prints text", "Adds numbers"], "correct_answer": 0},
+    ],
+}
+
+def bearer(username: str) -> dict:
+    return {"Authorization": f"Bearer {auth.create_access_token({'sub': username})}"}
+
+# Add an instructor and a student, returning their auth headers
+def add_users(database):
+    with database.Session() as db:
+        db.add_all([User(username="teacher", role="instructor"), User(username="pupil", role="student")])
+        db.commit()
+    return bearer("teacher"), bearer("pupil")
+
+# Build an app with just the quizzes router on a throwaway SQLite file
+@pytest.fixture()
+def client(database):
+    quizzes.answer_key_cache.clear()
+    quizzes.quiz_payload_cache.clear()
+    quizzes.score_buffer.session_factory = database.AsyncSession
+    app = FastAPI()
+    app.include_router(quizzes.router, prefix="/quizzes")
+    app.dependency_overrides[get_async_db] = database.override_get_async_db
+    with TestClient(app) as client:
+        yield client
+        client.portal.call(quizzes.score_buffer.close)
+
+# Test ETag revalidation of a single quiz
+def test_get_quiz_etag(client):
+    quiz_id = client.post("/quizzes/create_quiz", json=quiz_data).json()["quiz_id"]
+    response = client.get(f"/quizzes/get_quiz/{quiz_id}")
+    assert response.status_code == 200
+    assert response.json()["title"] == quiz_data["title"]
+    assert response.headers["cache-control"] == "public, no-cache"
+
+    response = client.get(f"/quizzes/get_quiz/{quiz_id}", headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
+
+# Test that the quiz listing ETag changes when a quiz is added
+def test_get_quizzes_etag(client):
+    client.post("/quizzes/create_quiz", json=quiz_data)
+    etag = client.get("/quizzes/get_quizzes").headers["etag"]
+    assert client.get("/quizzes/get_quizzes", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/quizzes/create_quiz", json=quiz_data)
+    response = client.get("/quizzes/get_quizzes", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 1, "title": quiz_data["title"], "question_count": 2},
+        {"id": 2, "title": quiz_data["title"], "question_count": 2},
+    ]
+
+# Test submitting answers for a score, as the signed-in user
+def test_submit_quiz(client, database):
+    _, student = add_users(database)
+    quiz_id = client.post("/quizzes/create_quiz", json=quiz_data).json()["quiz_id"]
+    submission = {"quiz_id": quiz_id, "answers": [
+        {"question_id": 0, "selected_answer": 1},
+        {"question_id": 1, "selected_answer": 1},
+    ]}
+    assert client.post(f"/quizzes/submit_quiz/{quiz_id}", json=submission).status_code == 401
+    response = client.post(f"/quizzes/submit_quiz/{quiz_id}", json=submission, headers=student)
+    assert response.status_code == 200
+    assert response.json()["score"] == 1
+
+    # Resubmitting replaces the stored score rather than adding a row
+    submission["answers"][1]["selected_answer"] = 0
+    assert client.post(f"/quizzes/submit_quiz/{quiz_id}", json=submission, headers=student).json()["score"] == 2
+    client.portal.call(quizzes.score_buffer.flush)
+    with database.Session() as db:
+        assert [(row.user_id, row.score) for row in db.scalars(select(QuizScore))] == [(2, 2)]
+
+# Test that two users' submissions are scored and stored separately
+def test_submit_quiz_per_user(client, database):
+    grader, student = add_users(database)
+    quiz_id = client.post("/quizzes/create_quiz", json=quiz_data).json()["quiz_id"]
+    right = {"quiz_id": quiz_id, "answers": [
+        {"question_id": 0, "selected_answer": 1},
+        {"question_id": 1, "selected_answer": 0},
+    ]}
+    wrong = {"quiz_id": quiz_id, "answers": [{"question_id": 0, "selected_answer": 0}]}
+    assert client.post(f"/quizzes/submit_quiz/{quiz_id}", json=right, headers=grader).json()["score"] == 2
+    assert client.post(f"/quizzes/submit_quiz/{quiz_id}", json=wrong, headers=student).json()["score"] == 0
+    client.portal.call(quizzes.score_buffer.flush)
+    with database.Session() as db:
+        assert sorted((row.user_id, row.score) for row in db.scalars(select(QuizScore))) == [(1, 2), (2, 0)]
+    stats = client.get(f"/quizzes/quiz_stats/{quiz_id}").json()
+    assert stats["submissions"] == 2
+    assert stats["leaderboard"] == [{"user_id": 1, "score": 2}, {"user_id": 2, "score": 0}]
+
+    # A token for a user who no longer exists is not accepted
+    assert client.post(f"/quizzes/submit_quiz/{quiz_id}", json=right, headers=bearer("ghost")).status_code == 401
+
+# Test that quizzes come back in question and option order, without their answers
+def test_get_quiz_round_trip(client, database):
+    _, student = add_users(database)
+    first = client.post("/quizzes/create_quiz", json=quiz_data).json()["quiz_id"]
+    second = client.post("/quizzes/create_quiz", json=quiz_data).json()["quiz_id"]
+    assert second == first + 1
+    assert client.get(f"/quizzes/get_quiz/{first}").json() == {
+        "id": first,
+        "title": quiz_data["title"],
+        "description": quiz_data["description"],
+        "questions": [
+            {"question_id": 0, "question_text": "What is 2 + 2?", "options": ["3", "4", "5"]},
+            {"question_id": 1, "question_text": "What does 'print' do?", "options": ["Prints text", "Adds numbers"]},
+        ],
+    }
+    assert client.get("/quizzes/get_quiz/999").status_code == 404
+    assert client.post("/quizzes/submit_quiz/999", json={"quiz_id": 999, "answers": []}, headers=student).status_code == 404
+
+# Test that quiz payloads are serialized once per version and re-encoded after an edit
+def test_quiz_payload_cached_per_version(client):
+    quiz_id = client.post("/quizzes/create_quiz", json=quiz_data).json()["quiz_id"]
+    first = client.get(f"/quizzes/get_quiz/{quiz_id}").content
+    assert client.get(f"/quizzes/get_quiz/{quiz_id}").content == first
+    assert quizzes.quiz_payload_cache.stats()["hits"] == 1
+
+    edited = {**quiz_data, "title": "Python Basics Quiz v2"}
+    client.put(f"/quizzes/update_quiz/{quiz_id}", json=edited)
+    assert client.get(f"/quizzes/get_quiz/{quiz_id}").json()["title"] == "Python Basics Quiz v2"
+
+# Test grading many submissions in one request with per-question correctness, for graders only
+def test_submit_quizzes_bulk(client, database):
+    grader, student = add_users(database)
+    quiz_id = client.post("/quizzes/create_quiz", json=quiz_data).json()["quiz_id"]
+    bulk = {"submissions": [
+        {"user_id": 1, "quiz_id": quiz_id, "answers": [{"question_id": 0, "selected_answer": 1}]},
+        {"user_id": 2, "quiz_id": quiz_id, "answers": [
+            {"question_id": 0, "selected_answer": 1},
+            {"question_id": 0, "selected_answer": 1},
+            {"question_id": 1, "selected_answer": 0},
+        ]},
+        {"user_id": 3, "quiz_id": 999, "answers": []},
+    ]}
+    assert client.post("/quizzes/submit_quizzes", json=bulk).status_code == 401
+    assert client.post("/quizzes/submit_quizzes", json=bulk, headers=student).status_code == 403
+    results = client.post("/quizzes/submit_quizzes", json=bulk, headers=grader).json()["results"]
+    assert [result.get("score") for result in results] == [1, 2, None]
+    assert results[0]["correct"] == [True, False]
+    assert results[2]["error"] == "Quiz not found"
+    client.portal.call(quizzes.score_buffer.flush)
+    with database.Session() as db:
+        assert sorted((row.user_id, row.score) for row in db.scalars(select(QuizScore))) == [(1, 1), (2, 2)]
+
+# Test that editing a quiz recompiles its answer key
+def test_update_quiz_regrades(client, database):
+    _, student = add_users(database)
+    quiz_id = client.post("/quizzes/create_quiz", json=quiz_data).json()["quiz_id"]
+    submission = {"quiz_id": quiz_id, "answers": [{"question_id": 0, "selected_answer": 2}]}
+    assert client.post(f"/quizzes/submit_quiz/{quiz_id}", json=submission, headers=student).json()["score"] == 0
+
+    etag = client.get(f"/quizzes/get_quiz/{quiz_id}").headers["etag"]
+    edited = {**quiz_data, "questions": [{**quiz_data["questions"][0], "correct_answer": 2}]}
+    assert client.put(f"/quizzes/update_quiz/{quiz_id}", json=edited).status_code == 200
+    assert client.post(f"/quizzes/submit_quiz/{quiz_id}", json=submission, headers=student).json() == {
+        "score": 1, "correct": [True], "message": "Quiz submitted successfully.",
+    }
+    assert client.get(f"/quizzes/get_quiz/{quiz_id}", headers={"If-None-Match": etag}).status_code == 200
+
+# Test that of two edits made from the same version, one applies and the other gets a 409
+def test_concurrent_quiz_updates(client, database, monkeypatch):
+    quiz_id = client.post("/quizzes/create_quiz", json=quiz_data).json()["quiz_id"]
+    load_quiz = quizzes.load_quiz
+    loaded = []
+
+    # Neither edit goes on until both have read the quiz
+    async def load_together(db, quiz_id):
+        quiz = await load_quiz(db, quiz_id)
+        loaded.append(quiz_id)
+        while len(loaded) < 2:
+            await asyncio.sleep(0.01)
+        return quiz
+
+    async def edit(title):
+        async with database.AsyncSession() as db:
+            edited = quizzes.Quiz(**{**quiz_data, "title": title})
+            return await quizzes.update_quiz(quiz_id, edited, db)
+
+    async def race():
+        return await asyncio.gather(edit("First"), edit("Second"), return_exceptions=True)
+
+    monkeypatch.setattr(quizzes, "load_quiz", load_together)
+    results = client.portal.call(race)
+    applied = [title for title, result in zip(("First", "Second"), results) if isinstance(result, dict)]
+    rejected = [result for result in results if isinstance(result, HTTPException)]
+    assert len(applied) == 1
+    assert [error.status_code for error in rejected] == [409]
+
+    monkeypatch.undo()
+    quiz = client.get(f"/quizzes/get_quiz/{quiz_id}").json()
+    assert quiz["title"] == applied[0]
+    assert [question["question_id"] for question in quiz["questions"]] == [0, 1]
+    with database.Session() as db:
+        assert db.get(models.Quiz, quiz_id).version == 2
+
+# Test that buffered scores are coalesced per user and quiz before they are written
+def test_scores_written_behind(client, database):
+    _, student = add_users(database)
+    quiz_id = client.post("/quizzes/create_quiz", json=quiz_data).json()["quiz_id"]
+    for selected in (0, 1, 1):
+        submission = {"quiz_id": quiz_id, "answers": [{"question_id": 0, "selected_answer": selected}]}
+        client.post(f"/quizzes/submit_quiz/{quiz_id}", json=submission, headers=student)
+    with database.Session() as db:
+        assert db.scalars(select(QuizScore)).all() == []
+
+    assert quizzes.score_buffer.stats()["pending"] == 1
+    client.portal.call(quizzes.score_buffer.flush)
+    with database.Session() as db:
+        assert [row.score for row in db.scalars(select(QuizScore))] == [1]
+
+# Test that score statistics follow resubmissions and the leaderboard orders by score
+def test_quiz_stats(client, database):
+    grader, _ = add_users(database)
+    quiz_id = client.post("/quizzes/create_quiz", json=quiz_data).json()["quiz_id"]
+    right = [{"question_id": 0, "selected_answer": 1}, {"question_id": 1, "selected_answer": 0}]
+
+    def submit(scores):
+        bulk = [
+            {"user_id": user_id, "quiz_id": quiz_id, "answers": right[:score]} for user_id, score in scores
+        ]
+        client.post("/quizzes/submit_quizzes", json={"submissions": bulk}, headers=grader)
+        client.portal.call(quizzes.score_buffer.flush)
+
+    assert client.get(f"/quizzes/quiz_stats/{quiz_id}").json() == {
+        "quiz_id": quiz_id, "submissions": 0, "mean_score": None, "histogram": {}, "leaderboard": [],
+    }
+    submit([(1, 0), (2, 1), (3, 2)])
+    # User 1 retakes the quiz and user 3 drops a question; their old scores are replaced
+    submit([(1, 2), (3, 1)])
+    stats = client.get(f"/quizzes/quiz_stats/{quiz_id}", params={"top": 2}).json()
+    assert stats["submissions"] == 3
+    assert stats["mean_score"] == pytest.approx(4 / 3)
+    assert stats["histogram"] == {"1": 2, "2": 1}
+    assert stats["leaderboard"] == [{"user_id": 1, "score": 2}, {"user_id": 2, "score": 1}]
+    assert client.get("/quizzes/quiz_stats/999").status_code == 404
+
+# Test that two flushes racing on the same first attempt count it once
+def test_concurrent_score_flushes(client, database):
+    quiz_id = client.post("/quizzes/create_quiz", json=quiz_data).json()["quiz_id"]
+
+    async def flush(score):
+        async with database.AsyncSession() as db:
+            await quizzes.save_scores(db, [{"user_id": 1, "quiz_id": quiz_id, "score": score, "submitted_at": score}])
+
+    async def race():
+        await asyncio.gather(flush(1), flush(2))
+
+    client.portal.call(race)
+    with database.Session() as db:
+        final = db.scalar(select(QuizScore.score))
+        stats = db.get(QuizStats, quiz_id)
+        assert (stats.submissions, stats.total_score) == (1, final)
+        buckets = {row.score: row.count for row in db.scalars(select(QuizScoreBucket)) if row.count}
+        assert buckets == {final: 1}
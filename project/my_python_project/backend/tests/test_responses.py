@@ -0,0 +1,21 @@
+# Backend/app/tests/test_responses.py
+
+import json
+from app import responses
+
+page = {"items": [{"id": 1, "title": "Café au lait", "price": None, "tags": ["a", "b"]}], "next_cursor": "Mg"}
+
+# Test that responses decode to the same data with and without orjson
+def test_json_bytes_with_and_without_orjson(monkeypatch):
+    fast = responses.json_bytes(page)
+    monkeypatch.setattr(responses, "orjson", None)
+    fallback = responses.json_bytes(page)
+    assert json.loads(fast) == json.loads(fallback) == page
+    assert "Café".encode("utf-8") in fallback
+
+# Test that FastJSONResponse renders with the shared encoder
+def test_fast_json_response():
+    response = responses.FastJSONResponse(page, status_code=201)
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.body) == page
@@ -0,0 +1,99 @@
+# Backend/app/tests/test_seed.py
+
+import anyio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from app import main, seed
+from app.db import get_async_db
+from app.models.course import Course
+from app.models.quiz import Progress, Question, QuestionOption, Quiz
+from app.models.user import User
+from app.routers import auth
+
+request = seed.SeedRequest(users=50, courses=8, quizzes=4, questions_per_quiz=3, options_per_question=4, progress_per_user=2, seed=7)
+
+async def cheap_hash(password):
+    return "hashed"
+
+def dump(database):
+    with database.Session() as db:
+        return {
+            model.__tablename__: [tuple(row) for row in db.execute(select(*model.__table__.columns).order_by(*model.__table__.primary_key))]
+            for model in (User, Course, Quiz, Question, QuestionOption, Progress)
+        }
+
+@pytest.fixture()
+def seeded(make_database, monkeypatch):
+    # Keep bcrypt cheap; the seeded users share a single hash anyway
+    monkeypatch.setattr(seed, "hash_password_async", cheap_hash)
+
+    def run(name, chunk_size=7):
+        database = make_database(name)
+
+        async def go():
+            async with database.AsyncSession() as db:
+                return await seed.seed_database(db, request, chunk_size=chunk_size)
+        return database, go
+
+    return run
+
+# Test that the same seed produces the same rows, whatever the chunk size
+def test_seed_is_deterministic(seeded):
+    first_database, first = seeded("first.db", chunk_size=7)
+    second_database, second = seeded("second.db", chunk_size=1000)
+    report = anyio.run(first)
+    anyio.run(second)
+    assert dump(first_database) == dump(second_database)
+    assert {table: report[table] for table in ("users", "courses", "quizzes", "quiz_questions", "quiz_options", "progress")} == {
+        "users": 50, "courses": 8, "quizzes": 4, "quiz_questions": 12, "quiz_options": 48, "progress": 100,
+    }
+    assert report["rows"] == 222 and report["rows_per_sec"] > 0
+
+    # Relations point at seeded rows, and progress never repeats a (user, course) pair
+    rows = dump(first_database)
+    course_ids = {row[0] for row in rows["courses"]}
+    assert {row[1] for row in rows["quizzes"]} <= course_ids
+    with first_database.Session() as db:
+        assert db.scalar(select(func.count(func.distinct(Progress.user_id)))) == 50
+
+# Test that seeding again appends a second dataset after the existing ids
+def test_seed_appends(seeded):
+    database, run = seeded("append.db")
+    anyio.run(run)
+    anyio.run(run)
+    with database.Session() as db:
+        assert db.scalar(select(func.count()).select_from(User)) == 100
+        assert db.scalar(select(func.max(QuestionOption.question_id))) == 24
+
+# Test the seeding endpoint with its default, small dataset, for admins only
+def test_seed_all_endpoint(database, monkeypatch):
+    monkeypatch.setattr(seed, "hash_password_async", cheap_hash)
+    with database.Session() as db:
+        db.add_all([User(username="root", role="admin"), User(username="teacher", role="instructor")])
+        db.commit()
+    admin, instructor = (
+        {"Authorization": f"Bearer {auth.create_access_token({'sub': username})}"} for username in ("root", "teacher")
+    )
+    app = FastAPI()
+    app.include_router(seed.router, prefix="/seed")
+    app.dependency_overrides[get_async_db] = database.override_get_async_db
+    with TestClient(app) as client:
+        assert client.post("/seed/seed_all").status_code == 401
+        assert client.post("/seed/seed_all", headers=instructor).status_code == 403
+        response = client.post("/seed/seed_all", headers=admin)
+        assert response.status_code == 200
+        assert response.json()["courses"] == 20
+        assert client.post("/seed/seed_all", json={"users": 10**9}, headers=admin).status_code == 422
+
+        # Failures are reported without their details
+        async def broken(db, request):
+            raise RuntimeError("INSERT INTO users ... secret")
+        monkeypatch.setattr(seed, "seed_database", broken)
+        response = client.post("/seed/seed_all", headers=admin)
+        assert (response.status_code, response.json()) == (500, {"detail": "Seeding failed"})
+
+# Test that the app does not serve the seeding endpoint unless SEED_ENDPOINT is set
+def test_seed_endpoint_not_mounted():
+    assert not any(getattr(route, "path", "").startswith("/seed") for route in main.app.routes)
@@ -0,0 +1,55 @@
+# Backend/app/tests/test_startup.py
+
+import subprocess
+import sys
+from fastapi.testclient import TestClient
+from app import main
+from app.cache import course_cache
+from app.models.course import Course
+from app.models.quiz import Question, Quiz
+from app.routers import auth, quizzes, upload
+from benchmarks.import_time import LAZY_MODULES, parse_importtime, top_modules
+
+# Test that importing the app leaves the heavy optional libraries unimported
+def test_import_is_lazy():
+    code = f"import sys, app.main; print(','.join(name for name in {LAZY_MODULES!r} if name in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+# Test reading -X importtime output
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   sqlalchemy.util\n"
+        "import time:       300 |        420 | sqlalchemy\n"
+        "import time:        50 |        470 | app.main\n"
+    )
+    modules = parse_importtime(output)
+    assert modules["sqlalchemy.util"] == (120, 120)
+    assert modules["app.main"] == (50, 470)
+    assert [name for name, _, _ in top_modules(modules, 5)] == ["app.main", "sqlalchemy"]
+
+# Test that the lifespan creates the tables and upload folder, loads auth and warms the caches
+def test_lifespan_warms_caches(tmp_path, monkeypatch, database):
+    monkeypatch.setattr(main, "init_db", lambda: None)  # The fixture already created the tables
+    monkeypatch.setattr(main, "AsyncSessionLocal", database.AsyncSession)
+    monkeypatch.setattr(upload, "UPLOAD_FOLDER", tmp_path / "uploads")
+    monkeypatch.setattr(auth, "pwd_context", None)
+    course_cache.clear()
+    quizzes.answer_key_cache.clear()
+
+    with database.Session() as db:
+        db.add(Course(id=1, title="Algebra", description="Numbers", price=10))
+        db.add(Quiz(id=7, course_id=1, title="Quiz", questions=[
+            Question(position=0, question_text="1 + 1?", correct_answer=2),
+            Question(position=1, question_text="2 + 2?", correct_answer=0),
+        ]))
+        db.commit()
+
+    with TestClient(main.app):
+        assert (tmp_path / "uploads").is_dir()
+        assert auth.pwd_context is not None
+        assert course_cache.get("courses:page:20::")["items"][0]["title"] == "Algebra"
+        assert quizzes.answer_key_cache.get("7:1") == (2, 0)
+    course_cache.clear()
+    quizzes.answer_key_cache.clear()
@@ -0,0 +1,209 @@
+# Backend/app/tests/test_upload.py
+
+import hashlib
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.db import get_async_db
+from app.jobs import JobWorker
+from app.routers import upload
+
+# Build an app with just the upload router, storing files and the material table in a temporary folder
+@pytest.fixture()
+def client(monkeypatch, tmp_path, database):
+    monkeypatch.setattr(upload, "UPLOAD_FOLDER", tmp_path / "uploads")
+    monkeypatch.setattr(upload, "UPLOAD_CHUNK_SIZE", 1024)
+    app = FastAPI()
+    app.include_router(upload.router, prefix="/upload")
+    app.dependency_overrides[get_async_db] = database.override_get_async_db
+    with TestClient(app) as client:
+        yield client
+
+# Test streaming an upload into the blob store with its checksum
+def test_upload_course_material(client):
+    content = b"x" * 5000
+    response = client.post("/upload/upload_course_material", files={"file": ("intro.mp4", content)})
+    assert response.status_code == 200
+    assert response.json()["size"] == len(content)
+    sha256 = hashlib.sha256(content).hexdigest()
+    assert response.json()["sha256"] == sha256
+    assert upload.blob_path(sha256).read_bytes() == content
+    assert upload.blob_path(sha256).parent.name == sha256[2:4]
+    assert not list(upload.blobs_folder().glob(".upload-*"))
+
+# Test that identical content uploaded under two names is stored once and reference counted
+def test_upload_deduplication(client):
+    content = b"same intro video"
+    sha256 = hashlib.sha256(content).hexdigest()
+    first = client.post("/upload/upload_course_material", files={"file": ("intro.mp4", content)})
+    second = client.post("/upload/upload_course_material", files={"file": ("intro-copy.mp4", content)})
+    assert first.json()["deduplicated"] is False
+    assert second.json()["deduplicated"] is True
+    assert len(list(upload.blobs_folder().rglob(sha256))) == 1
+
+    assert client.delete("/upload/files/intro.mp4").status_code == 200
+    assert client.get("/upload/files/intro-copy.mp4").content == content
+    assert client.delete("/upload/files/intro-copy.mp4").status_code == 200
+    assert not upload.blob_path(sha256).exists()
+    assert client.get("/upload/files/intro-copy.mp4").status_code == 404
+
+# Test that new-vs-duplicate comes from the blobs table, and losers of a filename race leave no file behind
+def test_upload_blob_registration(client, monkeypatch):
+    # A file left on disk with no blob row is not a duplicate; the upload stores its own copy
+    content = b"orphaned bytes"
+    sha256 = hashlib.sha256(content).hexdigest()
+    upload.blob_path(sha256).parent.mkdir(parents=True)
+    upload.blob_path(sha256).write_bytes(b"stale")
+    response = client.post("/upload/upload_course_material", files={"file": ("orphan.pdf", content)})
+    assert response.json()["deduplicated"] is False
+    assert client.get("/upload/files/orphan.pdf").content == content
+
+    # Two uploads of one name both pass the early check; the second is refused by the unique index
+    client.post("/upload/upload_course_material", files={"file": ("race.pdf", b"first")})
+    get_material = upload.get_material
+
+    async def no_material(db, filename):
+        return None
+
+    monkeypatch.setattr(upload, "get_material", no_material)
+    response = client.post("/upload/upload_course_material", files={"file": ("race.pdf", b"second")})
+    assert response.status_code == 400
+    assert not upload.blob_path(hashlib.sha256(b"second").hexdigest()).exists()
+    assert not list(upload.blobs_folder().glob(".upload-*"))
+
+    # Deleting the last reference and uploading the same bytes again stores them afresh
+    monkeypatch.setattr(upload, "get_material", get_material)
+    assert client.delete("/upload/files/orphan.pdf").status_code == 200
+    assert not upload.blob_path(sha256).exists()
+    response = client.post("/upload/upload_course_material", files={"file": ("again.pdf", content)})
+    assert response.json()["deduplicated"] is False
+    assert client.get("/upload/files/again.pdf").content == content
+    assert not list(upload.blob_path(sha256).parent.glob(".*"))
+
+# Test rejecting duplicates, disallowed types and oversized files
+def test_upload_rejections(client, monkeypatch):
+    client.post("/upload/upload_course_material", files={"file": ("intro.mp4", b"first")})
+    response = client.post("/upload/upload_course_material", files={"file": ("intro.mp4", b"second")})
+    assert response.status_code == 400
+    assert client.get("/upload/files/intro.mp4").content == b"first"
+
+    response = client.post("/upload/upload_course_material", files={"file": ("script.sh", b"echo")})
+    assert response.status_code == 400
+
+    monkeypatch.setattr(upload, "MAX_UPLOAD_SIZE", 2048)
+    response = client.post("/upload/upload_course_material", files={"file": ("big.mp4", b"x" * 4096)})
+    assert response.status_code == 413
+    assert client.get("/upload/files/big.mp4").status_code == 404
+    assert not list(upload.blobs_folder().glob(".upload-*"))
+
+# Test that a form arriving in small pieces is parsed as it streams in, skipping other fields
+def test_upload_streamed_in_pieces(client):
+    content = bytes(range(256)) * 20
+    boundary = "lesson-boundary"
+    headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    note = f'--{boundary}\r\nContent-Disposition: form-data; name="note"\r\n\r\nWeek 1\r\n'.encode()
+    body = note + (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="lesson.pdf"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    pieces = (body[start:start + 100] for start in range(0, len(body), 100))
+    response = client.post("/upload/upload_course_material", content=pieces, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["size"] == len(content)
+    assert client.get("/upload/files/lesson.pdf").content == content
+
+    # A form without a file, or a body that is not a form, is refused
+    no_file = note + f"--{boundary}--\r\n".encode()
+    assert client.post("/upload/upload_course_material", content=no_file, headers=headers).status_code == 400
+    assert client.post("/upload/upload_course_material", content=content).status_code == 400
+
+# Test that a body announced as too large is refused before any of it is stored
+def test_upload_refused_on_content_length(client, monkeypatch):
+    def unexpected(max_size):
+        raise AssertionError("the body should not be read")
+
+    monkeypatch.setattr(upload, "MAX_UPLOAD_SIZE", 2048)
+    monkeypatch.setattr(upload, "MULTIPART_OVERHEAD", 1024)
+    monkeypatch.setattr(upload, "BlobWriter", unexpected)
+    response = client.post("/upload/upload_course_material", files={"file": ("big.mp4", b"x" * 4096)})
+    assert response.status_code == 413
+
+# Test a resumable upload sent out of order, with a retried part
+def test_resumable_upload(client):
+    content = bytes(range(256)) * 10
+    response = client.post("/upload/sessions", json={"filename": "lesson.mov", "size": len(content), "part_size": 1024})
+    assert response.status_code == 201
+    upload_id = response.json()["upload_id"]
+
+    client.put(f"/upload/sessions/{upload_id}/parts/3", content=content[2048:])
+    client.put(f"/upload/sessions/{upload_id}/parts/1", content=b"garbage")
+    client.put(f"/upload/sessions/{upload_id}/parts/1", content=content[:1024])
+    status = client.get(f"/upload/sessions/{upload_id}").json()
+    assert status["received_ranges"] == [[0, 1023], [2048, len(content) - 1]]
+    assert client.post(f"/upload/sessions/{upload_id}/complete").status_code == 400
+
+    client.put(f"/upload/sessions/{upload_id}/parts/2", content=content[1024:2048])
+    response = client.post(f"/upload/sessions/{upload_id}/complete")
+    assert response.status_code == 200
+    assert response.json()["sha256"] == hashlib.sha256(content).hexdigest()
+    assert client.get("/upload/files/lesson.mov").content == content
+    assert client.get(f"/upload/sessions/{upload_id}").status_code == 404
+
+# Test aborting sessions, oversized or out-of-range parts and stale-session cleanup
+def test_upload_session_abort_and_cleanup(client):
+    upload_id = client.post("/upload/sessions", json={"filename": "a.mp4", "part_size": 10}).json()["upload_id"]
+    assert client.put(f"/upload/sessions/{upload_id}/parts/1", content=b"x" * 11).status_code == 413
+    assert client.delete(f"/upload/sessions/{upload_id}").status_code == 200
+    assert client.get(f"/upload/sessions/{upload_id}").status_code == 404
+
+    # Parts may not reach past the declared size
+    upload_id = client.post("/upload/sessions", json={"filename": "c.mp4", "size": 25, "part_size": 10}).json()["upload_id"]
+    assert client.put(f"/upload/sessions/{upload_id}/parts/4", content=b"x").status_code == 413
+    assert client.put(f"/upload/sessions/{upload_id}/parts/3", content=b"x" * 6).status_code == 413
+    assert client.put(f"/upload/sessions/{upload_id}/parts/3", content=b"x" * 5).status_code == 200
+    client.delete(f"/upload/sessions/{upload_id}")
+
+    client.post("/upload/sessions", json={"filename": "b.mp4"})
+    assert upload.cleanup_stale_sessions(max_age=-1) == 1
+
+# Test streaming an uploaded file with and without a Range header
+def test_stream_course_material(client):
+    content = bytes(range(256)) * 4
+    client.post("/upload/upload_course_material", files={"file": ("clip.mp4", content)})
+
+    response = client.get("/upload/files/clip.mp4")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "video/mp4"
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"] == f'"{hashlib.sha256(content).hexdigest()}"'
+    assert response.content == content
+
+    response = client.get("/upload/files/clip.mp4", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 100-199/{len(content)}"
+    assert response.content == content[100:200]
+
+    # A stale If-Range validator falls back to the full file
+    response = client.get("/upload/files/clip.mp4", headers={"Range": "bytes=100-199", "If-Range": '"stale"'})
+    assert response.status_code == 200
+
+    assert client.get("/upload/files/missing.mp4").status_code == 404
+    assert client.get("/upload/files/.sessions").status_code == 404
+
+# Test that uploads queue metadata extraction and that a worker runs it
+def test_upload_media_jobs(client, database):
+    content = b"%PDF-1.4 lecture notes"
+    response = client.post("/upload/upload_course_material", files={"file": ("notes.pdf", content)})
+    job_id, = response.json()["jobs"]
+    assert client.get(f"/upload/jobs/{job_id}").json()["status"] == "queued"
+
+    worker = JobWorker(session_factory=database.Session)
+    assert worker.run_once() is True
+    assert worker.run_once() is False
+    job = client.get(f"/upload/jobs/{job_id}").json()
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"size": len(content), "content_type": "application/pdf"}
+
+    # The same content under another name is already processed
+    response = client.post("/upload/upload_course_material", files={"file": ("notes-copy.pdf", content)})
+    assert response.json()["jobs"] == []
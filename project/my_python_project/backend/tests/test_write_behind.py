@@ -0,0 +1,85 @@
+# Backend/app/tests/test_write_behind.py
+
+import logging
+from contextlib import asynccontextmanager
+import anyio
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+from app.write_behind import BUFFERS, WriteBehindBuffer
+
+@asynccontextmanager
+async def no_session():
+    yield None
+
+# A buffer whose writes fail for rows in `bad` (a data error) or for everything while `down` is set
+@pytest.fixture()
+def store():
+    class Store:
+        def __init__(self):
+            self.rows = []
+            self.bad = set()
+            self.down = False
+
+        async def write(self, db, rows):
+            if self.down:
+                raise OperationalError("INSERT", {}, Exception("database is unreachable"))
+            if any(row["id"] in self.bad for row in rows):
+                raise IntegrityError("INSERT", {}, Exception("FOREIGN KEY constraint failed"))
+            self.rows.extend(rows)
+
+    store = Store()
+    buffer = WriteBehindBuffer("test", store.write, max_attempts=2)
+    buffer.session_factory = no_session
+    store.buffer = buffer
+    yield store
+    BUFFERS.remove(buffer)
+
+# Test that a row rejected for its data is isolated and dead-lettered while the rest are written
+def test_bad_row_is_dead_lettered(store, caplog):
+    store.bad = {5}
+    for n in range(8):
+        anyio.run(store.buffer.add, n, {"id": n})
+    with caplog.at_level(logging.ERROR, logger="app.write_behind.dead_letter"):
+        anyio.run(store.buffer.flush)
+    assert sorted(row["id"] for row in store.rows) == [0, 1, 2, 3, 4, 6, 7]
+    assert store.buffer.stats() == {"pending": 0, "flushed": 7, "coalesced": 0, "dead_lettered": 1}
+    assert "{'id': 5}" in caplog.text
+
+    # Later writes are no longer held up
+    anyio.run(store.buffer.add, 9, {"id": 9})
+    anyio.run(store.buffer.flush)
+    assert store.rows[-1] == {"id": 9}
+
+# Test that rows are kept through a failing flush and dead-lettered after max_attempts
+def test_retry_limit(store):
+    store.down = True
+    anyio.run(store.buffer.add, 1, {"id": 1})
+    with pytest.raises(OperationalError):
+        anyio.run(store.buffer.flush)
+    assert store.buffer.stats()["pending"] == 1
+
+    # A recovered database takes the kept row
+    store.down = False
+    anyio.run(store.buffer.flush)
+    assert store.rows == [{"id": 1}]
+
+    store.down = True
+    anyio.run(store.buffer.add, 2, {"id": 2})
+    with pytest.raises(OperationalError):
+        anyio.run(store.buffer.flush)
+    anyio.run(store.buffer.flush)  # Second attempt: dropped rather than retried forever
+    assert store.buffer.stats()["pending"] == 0
+    assert store.buffer.stats()["dead_lettered"] == 1
+
+# Test that writing through raises a failed row's error to the caller instead of dead-lettering it
+def test_write_through_raises(store):
+    store.buffer.enabled = False
+    store.bad = {2}
+    anyio.run(store.buffer.add, 1, {"id": 1})
+    with pytest.raises(IntegrityError):
+        anyio.run(store.buffer.add, 2, {"id": 2})
+    store.down = True
+    with pytest.raises(OperationalError):
+        anyio.run(store.buffer.add, 3, {"id": 3})
+    assert store.rows == [{"id": 1}]
+    assert store.buffer.stats() == {"pending": 0, "flushed": 1, "coalesced": 0, "dead_lettered": 0}